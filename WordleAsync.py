@@ -0,0 +1,200 @@
+import asyncio
+import copy
+import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from WordleBitmap import CompactIds
+from WordleIndex import (ALPHABETS, WordIndex, build_ranks, describe_violation, feedback_filters, load_frequencies,
+                         ranked, sorted_words)
+from WordleSession import empty_filters, filters_from_json, filters_to_json
+from WordleSolver import rank_guesses
+
+CACHE_SIZE = 1024      # candidate sets kept for reuse, shared by every session
+MAX_SESSIONS = 10000   # sessions kept by AsyncEngine.session(), least recently used dropped first
+SUGGEST_LIMIT = 300    # largest candidate set scored for a suggestion
+
+
+# --- Shared engine ---
+class AsyncEngine:
+    # One read-only index serving any number of sessions from asyncio code.
+    # Index work runs on `executor` (a thread pool unless one is given), so
+    # the event loop never blocks on it. Queries are keyed on their filters
+    # and pattern: a query already running is awaited rather than started
+    # again, and recent results are reused, so sessions at the same point
+    # of the same puzzle share one candidate set. Sets are kept as
+    # CompactIds, so neither the cache nor a session ever holds a mask the
+    # size of the dictionary.
+    def __init__(self, index, executor=None, alphabet=None, cache_size=CACHE_SIZE, max_sessions=MAX_SESSIONS):
+        self.index = index
+        self.executor = executor or ThreadPoolExecutor()
+        self.alphabet = ALPHABETS[alphabet] if alphabet else None
+        self.cache_size = cache_size
+        self.max_sessions = max_sessions
+        self.cache = OrderedDict()   # query key -> CompactIds
+        self.pending = {}            # query key -> future of a running match
+        self.sessions = OrderedDict()
+
+    @classmethod
+    async def load(cls, words_path="words.txt", length=5, frequencies_path="frequencies.txt", alphabet=None,
+                   **options):
+        # Builds the index off the event loop; frequencies enable ordered results
+        def build():
+            letters = ALPHABETS[alphabet] if alphabet else None
+            index = WordIndex(sorted_words(words_path, length, length, alphabet=letters), length)
+            build_ranks(index, load_frequencies(frequencies_path, length, letters))
+            return index
+        index = await asyncio.get_running_loop().run_in_executor(options.get("executor"), build)
+        return cls(index, alphabet=alphabet, **options)
+
+    def fold(self, text):
+        text = text.strip().lower()
+        return text if self.alphabet is None else self.alphabet.fold_text(text)
+
+    def run(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _match(self, filters, pattern):
+        mask = self.index.match(filters)
+        if pattern and mask:
+            mask = self.index.match_pattern(pattern, mask)
+        return CompactIds.from_mask(mask)
+
+    async def match(self, filters, pattern=""):
+        # Candidate set for `filters` and an optional pattern. Errors (a
+        # bad pattern) reach the caller and are not cached.
+        key = (json.dumps(filters_to_json(filters), sort_keys=True), pattern)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        future = self.pending.get(key)
+        if future is None:
+            # The worker thread gets its own copy; the session may change
+            # its filters while the match runs
+            future = self.run(self._match, copy.deepcopy(filters), pattern)
+            self.pending[key] = future
+            future.add_done_callback(lambda f: self._finish(key, f))
+        # Shielded, so one caller giving up doesn't cancel it for the others
+        return await asyncio.shield(future)
+
+    def _finish(self, key, future):
+        del self.pending[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.cache[key] = future.result()
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def session(self, key):
+        # The session for `key` (a user or chat id), created on first use
+        session = self.sessions.pop(key, None) or AsyncSession(self)
+        self.sessions[key] = session
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        return session
+
+    def end(self, key):
+        self.sessions.pop(key, None)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+# --- Per-user state ---
+class AsyncSession:
+    # One game: its own filters, pattern, hard-mode flag and played words,
+    # plus the last candidate set, dropped whenever the state changes.
+    # Everything else lives in the engine, so a session stays small.
+    __slots__ = ("engine", "filters", "pattern", "hard", "played", "_mask", "_version")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._version = 0
+        self.reset()
+
+    def _changed(self):
+        # A match still running for the old state must not be cached
+        self._mask = None
+        self._version += 1
+
+    def reset(self):
+        self.filters = empty_filters()
+        self.pattern = ""
+        self.hard = False
+        self.played = ()
+        self._changed()
+
+    def state(self):
+        # JSON-ready, for keeping sessions across restarts
+        return {"filters": filters_to_json(self.filters), "pattern": self.pattern,
+                "hard": self.hard, "played": list(self.played)}
+
+    def restore(self, state):
+        self.filters = filters_from_json(state.get("filters", {}))
+        self.pattern = state.get("pattern", "")
+        self.hard = state.get("hard", False)
+        self.played = tuple(state.get("played", ()))
+        self._changed()
+
+    def guess(self, guess, pattern):
+        # Folds one guess's feedback into the filters. `pattern` is the
+        # base-3 int of WordleIndex.feedback or a string of digits, one per
+        # letter: 0 grey, 1 yellow, 2 green.
+        guess = self.engine.fold(guess)
+        if len(guess) != self.engine.index.length or not guess.isalpha():
+            raise ValueError(f"Guess must be {self.engine.index.length} letters")
+        if isinstance(pattern, str):
+            if len(pattern) != len(guess) or set(pattern) - set("012"):
+                raise ValueError("Feedback must be one digit 0-2 per letter")
+            pattern = sum(int(d) * 3 ** pos for pos, d in enumerate(pattern))
+        if self.hard:
+            problem = describe_violation(guess, self.filters)
+            if problem:
+                raise ValueError(problem)
+        feedback_filters(guess, pattern, self.filters)
+        self.played += (guess,)
+        self._changed()
+
+    def set_filters(self, filters):
+        self.filters = filters
+        self._changed()
+
+    def set_pattern(self, pattern):
+        self.pattern = self.engine.fold(pattern)
+        self._changed()
+
+    async def candidates(self):
+        if self._mask is not None:
+            return self._mask
+        version, played = self._version, self.played
+        ids = await self.engine.match(self.filters, self.pattern)
+        # Filters can't always rule out the played words themselves
+        masks = [self.engine.index.match_pattern(w) for w in played]
+        if any(masks):
+            ids = ids - CompactIds.from_ids(m.bit_length() - 1 for m in masks if m)
+        if version == self._version:
+            self._mask = ids
+        return ids
+
+    async def count(self):
+        return len(await self.candidates())
+
+    async def words(self, limit=50, order=None):
+        # First `limit` candidates, alphabetical or by an index rank
+        # ("Frequency" or "Score"); only these are ever spelled out
+        ids = await self.candidates()
+        index = self.engine.index
+        if order is None:
+            return ids.words(index, limit)
+        top = await self.engine.run(lambda: ranked(index, list(ids), order).upto(limit))
+        return [index.word(i) for i in top]
+
+    async def suggest(self):
+        # Best next guess among the candidates, or "" when there are too
+        # many to score
+        ids = await self.candidates()
+        index = self.engine.index
+        if not 0 < len(ids) <= SUGGEST_LIMIT or not hasattr(index, "split"):
+            return ""
+        best = await self.engine.run(lambda: rank_guesses(index, ids.to_mask(), list(ids))[0])
+        return index.word(best)
@@ -0,0 +1,161 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+from WordleIndex import bitset, iter_ids
+
+CHUNK_BITS = 16   # each container covers 2 ** 16 consecutive ids
+ARRAY, BITMAP, RUNS = 0, 1, 2
+_CHUNK_BYTES = 1 << CHUNK_BITS - 3
+_LOW = (1 << CHUNK_BITS) - 1
+
+
+# --- Containers ---
+# One chunk of ids is an int of 2 ** 16 bits while being combined, and is
+# stored as whichever form is smallest: the sorted low bits, the int
+# itself, or (start, length - 1) pairs for runs of consecutive ids.
+def _encode(chunk):
+    # A bitmap only spans up to its highest id, which makes it the small
+    # form for the short last chunk of a small dictionary too
+    count = chunk.bit_count()
+    starts = chunk & ~(chunk << 1)
+    runs = starts.bit_count()
+    bitmap = (chunk.bit_length() + 7) // 8
+    if 4 * runs < min(2 * count, bitmap):
+        ends = chunk & ~(chunk >> 1)
+        data = array("H")
+        for start, end in zip(iter_ids(starts), iter_ids(ends)):
+            data.append(start)
+            data.append(end - start)
+        return RUNS, data, count
+    if 2 * count < bitmap:
+        return ARRAY, array("H", iter_ids(chunk)), count
+    return BITMAP, chunk, count
+
+def _decode(kind, data):
+    if kind == BITMAP:
+        return data
+    if kind == ARRAY:
+        return bitset(data, 1 << CHUNK_BITS)
+    chunk = 0
+    for k in range(0, len(data), 2):
+        chunk |= ((2 << data[k + 1]) - 1) << data[k]
+    return chunk
+
+def _ids(kind, data):
+    if kind == BITMAP:
+        return iter_ids(data)
+    if kind == ARRAY:
+        return iter(data)
+    return (i for k in range(0, len(data), 2) for i in range(data[k], data[k] + data[k + 1] + 1))
+
+
+# --- Compressed id sets ---
+class CompactIds:
+    # Immutable set of word ids in roaring-bitmap form: ids are grouped by
+    # their high bits and each non-empty group is one container. Filtered
+    # candidates are usually few or clustered (a green first letter is one
+    # run of ids), so a set typically costs a few hundred bytes where the
+    # int mask costs a bit per dictionary word and a word list far more.
+    # Set operations decode only the containers both sides have.
+    __slots__ = ("keys", "kinds", "data", "total")
+
+    def __init__(self, keys=(), kinds=b"", data=(), total=0):
+        self.keys = array("I", keys)   # high bits of each container, ascending
+        self.kinds = bytes(kinds)
+        self.data = tuple(data)
+        self.total = total
+
+    @classmethod
+    def _from_chunks(cls, chunks):
+        keys, kinds, data, total = [], bytearray(), [], 0
+        for key, chunk in chunks:
+            if chunk:
+                kind, d, count = _encode(chunk)
+                keys.append(key)
+                kinds.append(kind)
+                data.append(d)
+                total += count
+        return cls(keys, kinds, data, total)
+
+    @classmethod
+    def from_mask(cls, mask):
+        raw = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        return cls._from_chunks((key, int.from_bytes(raw[start:start + _CHUNK_BYTES], "little"))
+                                for key, start in enumerate(range(0, len(raw), _CHUNK_BYTES)))
+
+    @classmethod
+    def from_ids(cls, ids):
+        ids = list(ids)
+        return cls.from_mask(bitset(ids, max(ids, default=-1) + 1))
+
+    def _chunk(self, k):
+        return _decode(self.kinds[k], self.data[k])
+
+    def _positions(self):
+        return {key: k for k, key in enumerate(self.keys)}
+
+    def to_mask(self):
+        mask = 0
+        for k, key in enumerate(self.keys):
+            mask |= self._chunk(k) << (key << CHUNK_BITS)
+        return mask
+
+    def __len__(self):
+        return self.total
+
+    def __bool__(self):
+        return self.total > 0
+
+    def __eq__(self, other):
+        # Encoding is deterministic, so equal sets have equal containers
+        return (isinstance(other, CompactIds) and self.keys == other.keys
+                and self.kinds == other.kinds and self.data == other.data)
+
+    __hash__ = None
+
+    def __iter__(self):
+        for key, kind, d in zip(self.keys, self.kinds, self.data):
+            base = key << CHUNK_BITS
+            for low in _ids(kind, d):
+                yield base + low
+
+    def __contains__(self, i):
+        key, low = i >> CHUNK_BITS, i & _LOW
+        k = bisect_left(self.keys, key)
+        if k == len(self.keys) or self.keys[k] != key:
+            return False
+        kind, d = self.kinds[k], self.data[k]
+        if kind == BITMAP:
+            return bool(d >> low & 1)
+        if kind == ARRAY:
+            j = bisect_left(d, low)
+            return j < len(d) and d[j] == low
+        j = bisect_right(d[::2], low) - 1
+        return j >= 0 and low <= d[2 * j] + d[2 * j + 1]
+
+    def __and__(self, other):
+        mine, theirs = self._positions(), other._positions()
+        return CompactIds._from_chunks((key, self._chunk(mine[key]) & other._chunk(theirs[key]))
+                                       for key in sorted(mine.keys() & theirs.keys()))
+
+    def __or__(self, other):
+        mine, theirs = self._positions(), other._positions()
+        return CompactIds._from_chunks(
+            (key, (self._chunk(mine[key]) if key in mine else 0) | (other._chunk(theirs[key]) if key in theirs else 0))
+            for key in sorted(mine.keys() | theirs.keys()))
+
+    def __sub__(self, other):
+        mine, theirs = self._positions(), other._positions()
+        return CompactIds._from_chunks(
+            (key, self._chunk(k) & ~other._chunk(theirs[key]) if key in theirs else self._chunk(k))
+            for key, k in mine.items())
+
+    def __sizeof__(self):
+        # Counts the containers too, so deep_size sees the whole set
+        return (object.__sizeof__(self) + self.keys.__sizeof__() + self.kinds.__sizeof__()
+                + self.data.__sizeof__() + sum(d.__sizeof__() for d in self.data))
+
+    def words(self, index, limit=None):
+        # Display only: spells out the first `limit` ids
+        return [index.word(i) for i in islice(self, limit)]
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+import os
+
+EXPORT_CHUNK = 2000   # words turned into text per step
+FORMATS = ("txt", "csv", "json")
+
+
+# --- Rows ---
+def export_columns(index, extras=False):
+    # "frequency" is the raw count from frequencies.txt and "score" the
+    # word's place in the Frequency + Info order (1 is best)
+    columns = ["word"]
+    if extras:
+        if getattr(index, "freq", None) is not None:
+            columns.append("frequency")
+        if "Score" in getattr(index, "ranks", {}):
+            columns.append("score")
+    return columns
+
+def _rows(index, ids, columns):
+    word = index.word
+    freq = index.freq if "frequency" in columns else None
+    score = index.ranks["Score"] if "score" in columns else None
+    for i in ids:
+        row = [word(i)]
+        if freq is not None:
+            row.append(round(freq[i], 2))
+        if score is not None:
+            row.append(score[i] + 1)
+        yield row
+
+
+# --- Streaming writers ---
+def export_chunks(index, results, fmt, extras=False, chunk=EXPORT_CHUNK):
+    # Yields the export as text pieces of `chunk` words each. `results` is
+    # a RankedIds, read a page at a time so a ranked order is only sorted
+    # as far as it has been written.
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}")
+    columns = export_columns(index, extras)
+    if fmt == "csv":
+        yield ",".join(columns) + "\n"
+    elif fmt == "json":
+        yield "["
+    first = True
+    for start in range(0, len(results), chunk):
+        rows = _rows(index, results.page(start, start + chunk), columns)
+        if fmt == "txt":
+            yield "".join("\t".join(map(str, r)) + "\n" for r in rows)
+        elif fmt == "csv":
+            buf = io.StringIO()
+            csv.writer(buf, lineterminator="\n").writerows(rows)
+            yield buf.getvalue()
+        else:
+            if len(columns) == 1:
+                body = json.dumps([r[0] for r in rows], ensure_ascii=False, separators=(",\n", ":"))[1:-1]
+            else:
+                body = ",\n".join(json.dumps(dict(zip(columns, r)), ensure_ascii=False) for r in rows)
+            yield ("\n" if first else ",\n") + body
+            first = False
+    if fmt == "json":
+        yield "\n]\n"
+
+def export_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    return ext if ext in FORMATS else "txt"
+
+def write_export(path, index, results, extras=False):
+    # Blocking version for scripts; the app drives export_chunks itself
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for piece in export_chunks(index, results, export_format(path), extras):
+            f.write(piece)
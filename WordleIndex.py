@@ -0,0 +1,942 @@
+import bz2
+import gzip
+import heapq
+import lzma
+import re
+import sys
+import tempfile
+import unicodedata
+from array import array
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+# Wordle variants range from 4 to 11 letters
+MIN_LENGTH = 4
+MAX_LENGTH = 11
+
+
+# --- Alphabets ---
+# Words and typed letters are normalized before they reach an index, so "é"
+# typed as e + combining accent and "é" from the word list are one letter.
+# Folding strips accents from letters the alphabet doesn't list (Spanish
+# keeps ñ but plays á as a); with an NFD/NFKD form every accent is dropped.
+class Alphabet:
+    def __init__(self, letters="", form="NFC", fold=False):
+        if form in ("NFD", "NFKD") and not fold:
+            raise ValueError(f"{form} splits accented letters in two, so it needs fold=True")
+        self.form = form
+        self.fold = fold
+        self.letters = unicodedata.normalize("NFC", letters.lower())
+        if len(self.letters) > 64:
+            raise ValueError(f"Too many letters ({len(self.letters)}), at most 64 are supported")
+        self._allowed = set(self.letters)
+        self._folds = {}   # str.translate() table, filled in as letters turn up
+
+    def _fold(self, text):
+        for c in set(text) - self._allowed:
+            if ord(c) not in self._folds:
+                base = "".join(x for x in unicodedata.normalize("NFD", c) if not unicodedata.combining(x))
+                self._folds[ord(c)] = unicodedata.normalize("NFC", base)
+        return text.translate(self._folds)
+
+    def fold_text(self, text):
+        # Normalized and folded, but not checked; fit for patterns
+        text = unicodedata.normalize(self.form, text.strip().lower())
+        if self.fold:
+            if self.form in ("NFD", "NFKD"):
+                text = "".join(c for c in text if not unicodedata.combining(c))
+            elif not self._allowed.issuperset(text):
+                text = self._fold(text)
+        return text
+
+    def normalize(self, text):
+        # Normalized lower-case text, or None if it holds a non-letter
+        text = self.fold_text(text)
+        if self._allowed:
+            return text if self._allowed.issuperset(text) else None
+        return text if text.isalpha() else None
+
+    def letter(self, text):
+        c = self.normalize(text)
+        return c if c is not None and len(c) == 1 else None
+
+ALPHABETS = {
+    "english": Alphabet("abcdefghijklmnopqrstuvwxyz", fold=True),
+    "spanish": Alphabet("abcdefghijklmnñopqrstuvwxyz", fold=True),
+    "german": Alphabet("abcdefghijklmnopqrstuvwxyzäöüß"),
+    "polish": Alphabet("aąbcćdeęfghijklłmnńoóprsśtuwyzźż"),
+    "unicode": Alphabet(),
+}
+
+
+# --- Loading ---
+# Word lists are streamed: read a chunk at a time, deduped in a set that is
+# spilled to disk as a sorted run whenever it outgrows MEMORY_BUDGET, and
+# merged back into one sorted stream. Indexes are built off that stream.
+CHUNK_SIZE = 1 << 20          # characters read per chunk
+MEMORY_BUDGET = 256 << 20     # rough bytes of distinct words held before spilling a run
+WORD_COST = 80                # rough bytes per word held in a set, on top of its letters
+
+COMPRESSED = {
+    b"\x1f\x8b": gzip.open,
+    b"BZh": bz2.open,
+    b"\xfd7zXZ\x00": lzma.open,
+}
+
+def open_words(path):
+    # Plain text, or gzip/bz2/xz told apart by their magic number
+    with open(path, "rb") as f:
+        head = f.read(6)
+    for magic, opener in COMPRESSED.items():
+        if head.startswith(magic):
+            return opener(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+def _lines(path):
+    # Lines of a word list, read a chunk at a time
+    with open_words(path) as f:
+        rest = ""
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            lines = (rest + chunk).split("\n")
+            rest = lines.pop()
+            yield from lines
+        yield rest
+
+def read_words(path, min_length=MIN_LENGTH, max_length=MAX_LENGTH, alphabet=None):
+    # Normalized words in file order, duplicates included. Without an
+    # alphabet lines are only stripped and lower-cased.
+    for line in _lines(path):
+        w = line.strip().lower() if alphabet is None else alphabet.normalize(line)
+        if w is not None and min_length <= len(w) <= max_length:
+            yield w
+
+def _spill(words):
+    run = tempfile.TemporaryFile("w+", encoding="utf-8")
+    run.writelines(w + "\n" for w in sorted(words))
+    run.seek(0)
+    return run
+
+def sorted_words(path, min_length=MIN_LENGTH, max_length=MAX_LENGTH, budget=MEMORY_BUDGET, alphabet=None):
+    # Distinct normalized words in sorted order, using about `budget` bytes
+    # however large the input is
+    runs = []
+    batch = set()
+    used = 0
+    try:
+        for w in read_words(path, min_length, max_length, alphabet):
+            if w not in batch:
+                batch.add(w)
+                used += WORD_COST + len(w)
+                if used > budget:
+                    runs.append(_spill(batch))
+                    batch.clear()
+                    used = 0
+        if not runs:
+            yield from sorted(batch)
+            return
+        last = None
+        streams = [(line[:-1] for line in run) for run in runs]
+        for w in heapq.merge(*streams, sorted(batch)):
+            if w != last:
+                yield w
+                last = w
+    finally:
+        for run in runs:
+            run.close()
+
+def load_partitions(path="words.txt", min_length=MIN_LENGTH, max_length=MAX_LENGTH, budget=MEMORY_BUDGET,
+                    alphabet=None):
+    # The sorted stream is split by length, so every partition comes out sorted
+    partitions = defaultdict(list)
+    for w in sorted_words(path, min_length, max_length, budget, alphabet):
+        partitions[len(w)].append(w)
+    return dict(sorted(partitions.items()))
+
+
+def load_frequencies(path="frequencies.txt", length=None, alphabet=None):
+    # One "word count" pair per line; a missing file simply means no ranking.
+    # Words go through the same alphabet as the word list, so spellings that
+    # fold together share their counts.
+    freqs = {}
+    try:
+        with open_words(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 2:
+                    continue
+                w = parts[0].lower() if alphabet is None else alphabet.normalize(parts[0])
+                if w is not None and (length is None or len(w) == length):
+                    try:
+                        freqs[w] = freqs.get(w, 0) + float(parts[1])
+                    except ValueError:
+                        continue
+    except FileNotFoundError:
+        pass
+    return freqs
+
+
+# --- Result ranking ---
+def rank_order(keys):
+    # rank[id] = position of id when sorted by key, so ordering a filtered
+    # set is a plain integer sort
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    rank = array("I", bytes(4 * len(keys)))
+    for r, i in enumerate(order):
+        rank[i] = r
+    return rank
+
+class RankedIds:
+    # Candidate ids in rank order, sorted only as far as has been read.
+    # Ranks are a permutation, so the heap holds bare ints and `order` maps
+    # a popped rank back to its id. Unranked input is already in id
+    # (alphabetical) order and is passed through untouched.
+    def __init__(self, ids, rank=None, order=None):
+        self.total = len(ids)
+        if rank is None:
+            self.done = ids
+            self.heap = None
+        else:
+            self.done = []
+            self.heap = [rank[i] for i in ids]
+            heapq.heapify(self.heap)
+            self.order = order
+
+    def __len__(self):
+        return self.total
+
+    def _sort_to(self, n):
+        heap = self.heap
+        if heap:
+            done, order, pop = self.done, self.order, heapq.heappop
+            while len(done) < n and heap:
+                done.append(order[pop(heap)])
+
+    def upto(self, n):
+        self._sort_to(n)
+        return self.done[:n]
+
+    def page(self, start, stop):
+        self._sort_to(stop)
+        return self.done[start:stop]
+
+    def __sizeof__(self):
+        # Worked out rather than walked: the lists hold only ids and ranks,
+        # all small ints of one size. `order` is the index's rank column.
+        size = object.__sizeof__(self) + sys.getsizeof(vars(self))
+        for ids in (self.done, self.heap):
+            if ids is not None:
+                size += sys.getsizeof(ids) + len(ids) * sys.getsizeof(1 << 16)
+        return size
+
+def build_ranks(index, freqs):
+    # Attaches a `freq` column and precomputed rank columns to an index
+    index.freq, index.ranks, index.orders = rank_columns(index.words_for(index.all), freqs, index.length)
+
+def rank_columns(words, freqs, length):
+    # (freq, ranks, orders) for a sorted word list. "Score" combines
+    # frequency with how common the word's letters are in the partition,
+    # favouring likely answers that also make good guesses. Reads nothing
+    # but its arguments, so it can run away from the index's thread.
+    freq = array("f", (freqs.get(w, 0.0) for w in words))
+
+    positional = [defaultdict(int) for _ in range(length)]
+    overall = defaultdict(int)
+    for w in words:
+        for pos, c in enumerate(w):
+            positional[pos][c] += 1
+        for c in set(w):
+            overall[c] += 1
+    info = [sum(positional[pos][c] for pos, c in enumerate(w)) + sum(overall[c] for c in set(w))
+            for w in words]
+
+    freq_rank = rank_order([-f for f in freq])
+    info_rank = rank_order([-x for x in info])
+    ranks = {
+        "Frequency": freq_rank,
+        "Score": rank_order([freq_rank[i] + info_rank[i] for i in range(len(words))]),
+    }
+    orders = {}
+    for name, rank in ranks.items():
+        order = array("I", bytes(4 * len(rank)))
+        for i, r in enumerate(rank):
+            order[r] = i
+        orders[name] = order
+    return freq, ranks, orders
+
+def ranked(index, ids, name=None):
+    # An index whose rank columns are missing or being rebuilt lists ids
+    # in id (alphabetical) order
+    if name is None or name not in getattr(index, "ranks", {}):
+        return RankedIds(ids)
+    return RankedIds(ids, index.ranks[name], index.orders[name])
+
+
+# --- Bitsets over word ids ---
+def bitset(ids, size):
+    buf = bytearray((size + 7) // 8)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+def _set_bit(buf, byte, bit):
+    # Sets one bit of a growing little-endian bitset
+    if len(buf) <= byte:
+        buf.extend(bytes(byte + 1 - len(buf)))
+    buf[byte] |= bit
+
+def insert_bit(mask, i, bit=False):
+    # Shifts ids >= i up by one and puts `bit` at i
+    low = mask & ((1 << i) - 1)
+    return ((mask >> i) << (i + 1)) | low | (bool(bit) << i)
+
+def drop_bit(mask, i):
+    # Removes id i and shifts the ids above it down by one
+    low = mask & ((1 << i) - 1)
+    return ((mask >> (i + 1)) << i) | low
+
+def iter_ids(mask):
+    bits = bin(mask)[:1:-1]
+    i = bits.find("1")
+    while i != -1:
+        yield i
+        i = bits.find("1", i + 1)
+
+
+# --- Memory accounting ---
+def deep_size(obj, seen=None):
+    # Bytes held by `obj` and whatever it reaches through containers.
+    # Objects already in `seen` (shared between reports) count once.
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+    return total
+
+def word_list_size(words):
+    # deep_size of a list of same-length words, without visiting each str:
+    # they all take the size of the first, give or take a wider code point
+    return sys.getsizeof(words) + (len(words) * sys.getsizeof(words[0]) if words else 0)
+
+def memory_report(obj, seen=None):
+    # {attribute: bytes} for an index, trie or any other plain object
+    seen = set() if seen is None else seen
+    return {name.lstrip("_"): deep_size(value, seen) for name, value in vars(obj).items()}
+
+
+# --- Pattern queries ---
+# Patterns always describe the whole word. Wildcard form uses `?` for one
+# letter and `*` for any run; regex form accepts letters, `.`, `[...]`,
+# `[^...]`, the quantifiers `*`, `+`, `?` and (ignored) `^`/`$` anchors.
+REGEX_CHARS = set(".[]^$+")
+
+class Atom:
+    __slots__ = ("letters", "negate", "quant")
+
+    def __init__(self, letters, negate=False, quant=""):
+        self.letters = letters   # frozenset of letters, or None for any letter
+        self.negate = negate
+        self.quant = quant       # "", "*", "+" or "?"
+
+    def regex(self):
+        if self.letters is None:
+            body = "."
+        elif len(self.letters) == 1 and not self.negate:
+            body = re.escape(next(iter(self.letters)))
+        else:
+            body = "[" + ("^" if self.negate else "") + "".join(sorted(self.letters)) + "]"
+        return body + self.quant
+
+def _parse_class(pattern, i):
+    negate = pattern.startswith("^", i)
+    if negate:
+        i += 1
+    letters = set()
+    while i < len(pattern) and pattern[i] != "]":
+        c = pattern[i]
+        if i + 2 < len(pattern) and pattern[i + 1] == "-" and pattern[i + 2] != "]":
+            letters.update(chr(o) for o in range(ord(c), ord(pattern[i + 2]) + 1))
+            i += 3
+            continue
+        if not c.isalpha():
+            raise ValueError(f"Unsupported character in class: {c!r}")
+        letters.add(c)
+        i += 1
+    if i >= len(pattern):
+        raise ValueError("Unterminated character class")
+    return Atom(frozenset(letters), negate), i + 1
+
+@lru_cache(maxsize=64)
+def parse_pattern(pattern):
+    pattern = pattern.strip().lower()
+    is_regex = any(c in REGEX_CHARS for c in pattern)
+    if is_regex:
+        pattern = pattern.removeprefix("^").removesuffix("$")
+    atoms = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c.isalpha():
+            atoms.append(Atom(frozenset(c)))
+            i += 1
+        elif c == "." or (c == "?" and not is_regex):
+            atoms.append(Atom(None))
+            i += 1
+        elif c == "[":
+            atom, i = _parse_class(pattern, i + 1)
+            atoms.append(atom)
+        elif c == "*" and not is_regex:
+            atoms.append(Atom(None, quant="*"))
+            i += 1
+        elif c in "*+?" and atoms and not atoms[-1].quant:
+            atoms[-1].quant = c
+            i += 1
+        else:
+            raise ValueError(f"Unsupported pattern character: {c!r}")
+    return tuple(atoms)
+
+
+# --- Feedback ---
+# A feedback pattern packs one base-3 digit per position: 0 grey, 1 yellow,
+# 2 green. `solved_pattern(n)` is the all-green pattern.
+def feedback(guess, answer):
+    pattern = 0
+    unmatched = defaultdict(int)
+    for g, a in zip(guess, answer):
+        if g != a:
+            unmatched[a] += 1
+    for pos, (g, a) in enumerate(zip(guess, answer)):
+        if g == a:
+            pattern += 2 * 3 ** pos
+        elif unmatched[g]:
+            unmatched[g] -= 1
+            pattern += 3 ** pos
+    return pattern
+
+def solved_pattern(length):
+    return 3 ** length - 1
+
+def pattern_digits(pattern, length):
+    return [pattern // 3 ** pos % 3 for pos in range(length)]
+
+def feedback_filters(guess, pattern, filters):
+    # Folds one guess's feedback into a filters dict. A grey tile only
+    # becomes "Not Contains" when the letter isn't known to be in the word
+    # (a repeated letter can be grey here and green/yellow elsewhere); then
+    # it is recorded as "not at this position" if that slot is free.
+    # "Not Position" holds one letter per slot, so a yellow that lands on
+    # another letter's slot keeps the displaced letter as a "Contains".
+    digits = pattern_digits(pattern, len(guess))
+    for pos, (c, d) in enumerate(zip(guess, digits)):
+        if d == 2:
+            filters["At Position"][pos] = c
+    for pos, (c, d) in enumerate(zip(guess, digits)):
+        if d == 1:
+            _not_at(filters, pos, c)
+    present = known_letters(filters)
+    for pos, (c, d) in enumerate(zip(guess, digits)):
+        if d == 0:
+            if c not in present:
+                filters["Not Contains"].add(c)
+            elif pos not in filters["Not Position"] and filters["At Position"].get(pos) != c:
+                filters["Not Position"][pos] = c
+    return filters
+
+def known_letters(filters):
+    # Letters the filters say are in the word
+    letters = set(filters["At Position"].values()) | set(filters["Not Position"].values())
+    letters.update(value[0] for value in filters.get("Contains", ()))
+    return letters
+
+def _not_at(filters, pos, c):
+    old = filters["Not Position"].get(pos)
+    filters["Not Position"][pos] = c
+    if old is not None and old != c and old not in known_letters(filters):
+        filters.setdefault("Contains", []).append((old,))
+
+def describe_violation(guess, filters):
+    # First hint a guess ignores, in the wording hard mode uses; None if it
+    # satisfies them all
+    for pos, c in sorted(filters["At Position"].items()):
+        if pos >= len(guess) or guess[pos] != c:
+            return f"Letter {pos + 1} must be {c.upper()}"
+    for pos, c in sorted(filters["Not Position"].items()):
+        if c not in guess:
+            return f"Guess must contain {c.upper()}"
+        if pos < len(guess) and guess[pos] == c:
+            return f"Letter {pos + 1} can't be {c.upper()}"
+    for c in sorted(filters["Not Contains"]):
+        if c in guess:
+            return f"{c.upper()} is not in the word"
+    for key, values in filters.items():
+        ftype = FILTER_TYPES.get(key)
+        for value in values if ftype else ():
+            if not ftype.test(guess, *value):
+                return ftype.describe(*value) if ftype.describe else f"Guess fails {ftype.label.rstrip(':')}"
+    return None
+
+
+def contradicts(filters, length):
+    # True when no word of `length` letters can satisfy the filters, so a
+    # match can come back empty without touching the index
+    grey = filters["Not Contains"]
+    green = filters["At Position"]
+    yellow = filters["Not Position"]
+    for pos, c in green.items():
+        if pos >= length or c in grey or yellow.get(pos) == c:
+            return True
+    free = set(range(length)).difference(green)
+    required = set(yellow.values()).difference(green.values())
+    for c in required:
+        # Each letter known to be in the word needs a slot it may still take
+        if c in grey or not free.difference(p for p, y in yellow.items() if y == c):
+            return True
+    return len(required) > len(free)
+
+def word_matches(word, filters):
+    # The same test as WordIndex.match, for a single word
+    return (not any(c in word for c in filters["Not Contains"])
+            and all(pos < len(word) and word[pos] == c for pos, c in filters["At Position"].items())
+            and all(c in word and (pos >= len(word) or word[pos] != c)
+                    for pos, c in filters["Not Position"].items())
+            and all(FILTER_TYPES[key].test(word, *value)
+                    for key, values in filters.items() if key in FILTER_TYPES for value in values))
+
+def uses_letters(word, letters, exact=False):
+    # The anagram tests of WordIndex.anagrams/sub_anagrams, for one word
+    if exact:
+        return sorted(word) == sorted(letters)
+    return Counter(word) <= Counter(letters)
+
+def pattern_regex(pattern):
+    return re.compile("".join(a.regex() for a in parse_pattern(pattern)))
+
+
+# --- Filter types ---
+# Hints beyond the three tile colours are registered here instead of being
+# wired into the app one by one. A type names the inputs the app asks for
+# and how to apply a value: `mask(index, *value)` returns a candidate bitset
+# (or None when that index can't answer it) and `test(word, *value)` is the
+# per-word fallback. Values live as tuples in a list under the type's key
+# in the filters dict; match() ANDs every bitset into its plan and runs all
+# remaining fallbacks together in one pass over the survivors.
+FIELDS = {
+    "letter": str,
+    "position": lambda text: int(text) - 1,   # 1-based in the app
+    "count": int,
+}
+
+class FilterType:
+    __slots__ = ("key", "label", "fields", "test", "mask", "describe")
+
+    def __init__(self, key, label, fields, test, mask=None, describe=None):
+        self.key = key
+        self.label = label
+        self.fields = fields
+        self.test = test
+        self.mask = mask
+        self.describe = describe   # hard-mode message for a guess that fails, from the value
+
+FILTER_TYPES = {}
+
+def register_filter(key, label, fields, test, mask=None, describe=None):
+    FILTER_TYPES[key] = FilterType(key, label, fields, test, mask, describe)
+    return FILTER_TYPES[key]
+
+def plugin_steps(index, filters):
+    # ([bitset, ...], [(test, value), ...]) for the registered filters in use
+    masks, tests = [], []
+    for key, values in filters.items():
+        ftype = FILTER_TYPES.get(key)
+        if ftype is None:
+            continue
+        for value in values:
+            m = ftype.mask(index, *value) if ftype.mask else None
+            if m is None:
+                tests.append((ftype.test, value))
+            else:
+                masks.append(m)
+    return masks, tests
+
+def scan(index, mask, tests):
+    # Every fallback test fused into a single pass: each surviving word is
+    # decoded once and checked against all of them
+    if not tests or not mask:
+        return mask
+    word = index.word
+
+    def keep(i):
+        w = word(i)
+        return all(test(w, *value) for test, value in tests)
+
+    return bitset(filter(keep, iter_ids(mask)), index.size)
+
+def _has_mask(index, c):
+    has = getattr(index, "has", None)
+    return None if has is None else has.get(c, 0)
+
+def _count_mask(index, c, k):
+    if not hasattr(index, "at_least"):
+        return None
+    return index.at_least(c, k) & ~index.at_least(c, k + 1)
+
+register_filter("Contains", "Contains:", ("letter",), lambda w, c: c in w, _has_mask,
+                lambda c: f"Guess must contain {c.upper()}")
+register_filter("Letter Count", "Letter count:", ("letter", "count"), lambda w, c, k: w.count(c) == k, _count_mask,
+                lambda c, k: f"Guess must have {k} {c.upper()}")
+
+
+# --- Per-length index ---
+class WordIndex:
+    # One partition of the dictionary: every word has exactly `length` letters,
+    # so positional lookups never need a bounds check.
+    # Words live in a packed store rather than a list of str: `store` is
+    # every word's letter codes concatenated at a fixed width. Letter tests
+    # are answered by the bitsets alone, so no per-word column is kept and
+    # everything up to display works on integer ids.
+    def __init__(self, words=(), length=None):
+        # `words` may be any sorted iterable of unique words, so an index can
+        # be built straight off a streaming load without a list ever existing
+        self.length = length
+        self.size = 0
+        self.letters = ""
+        self._tables()
+        store = bytearray()
+        # Bitsets grow as little-endian bytearrays while building and are
+        # turned into ints once at the end
+        at_bits = None
+        has_bits = defaultdict(bytearray)
+        repeat_bits = defaultdict(bytearray)
+        known = set()
+        i = 0
+        for w in words:
+            if at_bits is None:
+                if self.length is None:
+                    self.length = len(w)
+                at_bits = [defaultdict(bytearray) for _ in range(self.length)]
+            if not known.issuperset(w):
+                self._add_letters("".join(sorted(set(w) - known)))
+                known.update(w)
+            codes = w.translate(self._encode).encode("latin-1")
+            byte, bit = i >> 3, 1 << (i & 7)
+            word_mask = 0
+            for pos, c in enumerate(codes):
+                _set_bit(at_bits[pos][c], byte, bit)
+                word_mask |= 1 << c
+            if word_mask.bit_count() < self.length:
+                for c in set(codes):
+                    for k in range(2, codes.count(c) + 1):
+                        _set_bit(repeat_bits[c, k], byte, bit)
+            c = 0
+            while word_mask:
+                if word_mask & 1:
+                    _set_bit(has_bits[c], byte, bit)
+                word_mask >>= 1
+                c += 1
+            store += codes
+            i += 1
+
+        if self.length is None:
+            self.length = 0
+        self.size = i
+        self.all = (1 << self.size) - 1
+        self.store = bytes(store)
+        letters = self.letters
+        self.at = [{letters[c]: int.from_bytes(b, "little") for c, b in pos_bits.items()}
+                   for pos_bits in at_bits or [{}] * self.length]
+        self.has = {letters[c]: int.from_bytes(b, "little") for c, b in has_bits.items()}
+        # Words holding a letter at least k times, for k >= 2
+        self.repeats = {(letters[c], k): int.from_bytes(b, "little") for (c, k), b in repeat_bits.items()}
+        self._anagrams = None
+        # Selectivity estimates for the query planner, kept up to date by
+        # insert() and remove()
+        self.at_counts = [{c: m.bit_count() for c, m in at.items()} for at in self.at]
+        self.has_counts = {c: m.bit_count() for c, m in self.has.items()}
+
+    def _tables(self):
+        # Letter <-> code translation; codes are below 64 so they fit a byte.
+        # Codes are handed out in order of first appearance.
+        self._encode = {ord(c): i for i, c in enumerate(self.letters)}
+        self._decode = {i: c for i, c in enumerate(self.letters)}
+
+    def _add_letters(self, new_letters):
+        if len(self.letters) + len(new_letters) > 64:
+            raise ValueError("Too many distinct letters, at most 64 are supported")
+        self.letters += new_letters
+        self._tables()
+
+    def drop_optional(self):
+        # Low-memory mode: the frequency column only feeds build_ranks, and
+        # the anagram hash is rebuilt on demand
+        self.freq = None
+        self._anagrams = None
+
+    def at_least(self, letter, k):
+        if k <= 0:
+            return self.all
+        if k == 1:
+            return self.has.get(letter, 0)
+        return self.repeats.get((letter, k), 0)
+
+    def __len__(self):
+        return self.size
+
+    def word(self, i):
+        length = self.length
+        return self.store[i * length:(i + 1) * length].decode("latin-1").translate(self._decode)
+
+    @property
+    def words(self):
+        text = self.store.decode("latin-1").translate(self._decode)
+        length = self.length
+        return [text[i:i + length] for i in range(0, len(text), length)]
+
+    def plan(self, filters):
+        # Query plan for `filters`: the bitsets every match must be in,
+        # rarest first by the precomputed counts, one bitset of words to
+        # remove and the per-word tests left for registered filters.
+        # Implied constraints are left out: a yellow letter that is green
+        # elsewhere needs no "has" test, and a yellow at a green position
+        # is already ruled out by the green.
+        green = filters["At Position"]
+        yellow = filters["Not Position"]
+        include = [(self.at_counts[pos].get(c, 0), self.at[pos].get(c, 0)) for pos, c in green.items()]
+        for c in set(yellow.values()).difference(green.values()):
+            include.append((self.has_counts.get(c, 0), self.has.get(c, 0)))
+        plugins, tests = plugin_steps(self, filters)
+        include.extend((m.bit_count(), m) for m in plugins)
+        include.sort(key=lambda step: step[0])
+        exclude = 0
+        for c in filters["Not Contains"]:
+            exclude |= self.has.get(c, 0)
+        for pos, c in yellow.items():
+            if pos < self.length and pos not in green:
+                exclude |= self.at[pos].get(c, 0)
+        return [m for _, m in include], exclude, tests
+
+    def match(self, filters):
+        if contradicts(filters, self.length):
+            return 0
+        include, exclude, tests = self.plan(filters)
+        mask = self.all
+        for m in include:
+            mask &= m
+            if not mask:
+                return 0
+        # Clearing bits through & avoids building the negative ~exclude
+        return scan(self, mask ^ (mask & exclude), tests)
+
+    def ids(self, mask):
+        return list(iter_ids(mask))
+
+    def words_for(self, mask):
+        return [self.word(i) for i in iter_ids(mask)]
+
+    def letter_counts(self, mask):
+        # [{letter: candidates with that letter there}, ...] per position,
+        # one AND and popcount per positional bitset; no word is decoded
+        if mask == self.all:
+            return [dict(counts) for counts in self.at_counts]
+        present = [c for c, m in self.has.items() if m & mask]
+        counts = []
+        for at in self.at:
+            pos = {}
+            for c in present:
+                n = (at.get(c, 0) & mask).bit_count()
+                if n:
+                    pos[c] = n
+            counts.append(pos)
+        return counts
+
+    # --- Anagram queries ---
+    def anagrams(self, letters):
+        # Words spelled with exactly these letters. Sorted-letter keys are
+        # hashed to id lists on first use, so a query is one dict lookup.
+        if len(letters) != self.length:
+            return 0
+        if self._anagrams is None:
+            keys = defaultdict(list)
+            for i, w in enumerate(self.words):
+                keys["".join(sorted(w))].append(i)
+            self._anagrams = dict(keys)
+        return bitset(self._anagrams.get("".join(sorted(letters)), ()), self.size)
+
+    def sub_anagrams(self, letters):
+        # Words using only these letters, each no more often than given: a
+        # letter that isn't offered rules out its "has" bitset, one that is
+        # offered k times rules out "at least k + 1 copies"
+        offered = Counter(letters)
+        exclude = 0
+        for c, m in self.has.items():
+            k = offered.get(c, 0)
+            exclude |= m if not k else self.at_least(c, k + 1)
+        return self.all ^ (self.all & exclude)
+
+    def _atom_mask(self, pos, atom):
+        if atom.letters is None:
+            return self.all
+        at = self.at[pos]
+        mask = 0
+        for letter in atom.letters:
+            mask |= at.get(letter, 0)
+        return self.all & ~mask if atom.negate else mask
+
+    def match_pattern(self, pattern, mask=None):
+        # Fixed-width atoms at either end map straight onto positional
+        # bitsets; only the variable-width middle ever reaches `re`.
+        atoms = parse_pattern(pattern)
+        if mask is None:
+            mask = self.all
+        variable = [i for i, a in enumerate(atoms) if a.quant]
+        if not variable:
+            if len(atoms) != self.length:
+                return 0
+            for pos, atom in enumerate(atoms):
+                mask &= self._atom_mask(pos, atom)
+            return mask
+
+        head = atoms[:variable[0]]
+        tail = atoms[variable[-1] + 1:]
+        if len(head) + len(tail) > self.length:
+            return 0
+        for pos, atom in enumerate(head):
+            mask &= self._atom_mask(pos, atom)
+        for pos, atom in enumerate(tail, self.length - len(tail)):
+            mask &= self._atom_mask(pos, atom)
+        for atom in atoms[variable[0]:variable[-1] + 1]:
+            if not atom.quant and not atom.negate and atom.letters and len(atom.letters) == 1:
+                mask &= self.has.get(next(iter(atom.letters)), 0)
+        if not mask:
+            return 0
+
+        middle = re.compile("".join(a.regex() for a in atoms[variable[0]:variable[-1] + 1]))
+        start, end = len(head), self.length - len(tail)
+        word = self.word
+        return bitset((i for i in iter_ids(mask) if middle.fullmatch(word(i), start, end)),
+                      self.size)
+
+    def split(self, guess, mask):
+        # Exact feedback classes of `mask` for `guess` as {pattern: mask},
+        # computed with bitset ANDs instead of scoring each candidate.
+        # Greens split on the positional bitsets; yellows then split on how
+        # many copies of each guessed letter are left over.
+        classes = {0: mask}
+        for pos, c in enumerate(guess):
+            at = self.at[pos].get(c, 0)
+            green = 2 * 3 ** pos
+            parts = {}
+            for pattern, m in classes.items():
+                if m & at:
+                    parts[pattern + green] = m & at
+                if m & ~at:
+                    parts[pattern] = m & ~at
+            classes = parts
+
+        for c in set(guess):
+            positions = [pos for pos, x in enumerate(guess) if x == c]
+            parts = {}
+            for pattern, m in classes.items():
+                greens = sum(1 for pos in positions if pattern // 3 ** pos % 3 == 2)
+                rest = [pos for pos in positions if pattern // 3 ** pos % 3 != 2]
+                if not rest:
+                    parts[pattern] = m
+                    continue
+                yellow = 0
+                for y in range(len(rest) + 1):
+                    sub = m & self.at_least(c, greens + y)
+                    if y < len(rest):
+                        sub &= ~self.at_least(c, greens + y + 1)
+                    if sub:
+                        parts[pattern + yellow] = sub
+                    if y < len(rest):
+                        yellow += 3 ** rest[y]
+            classes = parts
+        return classes
+
+    # --- Incremental maintenance ---
+    # Ids are alphabetical ranks, so adding or removing a word shifts the
+    # ids above it: every column is spliced and every bitset has one bit
+    # inserted or dropped, which is far cheaper than rebuilding.
+    def _position(self, word):
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word(mid) < word:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, word):
+        i = self._position(word)
+        return i if i < self.size and self.word(i) == word else -1
+
+    def insert(self, word):
+        # Returns the new word's id, or -1 if it was already present
+        if len(word) != self.length:
+            raise ValueError(f"{word!r} does not have {self.length} letters")
+        i = self._position(word)
+        if i < self.size and self.word(i) == word:
+            return -1
+        new_letters = "".join(sorted(set(word) - set(self.letters)))
+        if new_letters:
+            self._add_letters(new_letters)
+
+        self._anagrams = None
+        length = self.length
+        codes = word.translate(self._encode).encode("latin-1")
+        self.store = self.store[:i * length] + codes + self.store[i * length:]
+        self.size += 1
+        self.all = (1 << self.size) - 1
+
+        for pos, at in enumerate(self.at):
+            for c, m in at.items():
+                at[c] = insert_bit(m, i, word[pos] == c)
+            at.setdefault(word[pos], 1 << i)
+            self.at_counts[pos][word[pos]] = self.at_counts[pos].get(word[pos], 0) + 1
+        for c in set(word):
+            self.has_counts[c] = self.has_counts.get(c, 0) + 1
+        for c, m in self.has.items():
+            self.has[c] = insert_bit(m, i, c in word)
+        for c in set(word):
+            self.has.setdefault(c, 1 << i)
+        for (c, k), m in self.repeats.items():
+            self.repeats[c, k] = insert_bit(m, i, word.count(c) >= k)
+        for c in set(word):
+            for k in range(2, word.count(c) + 1):
+                self.repeats.setdefault((c, k), 1 << i)
+        return i
+
+    def remove(self, word):
+        # Returns the removed word's id, or -1 if it was not present
+        i = self.find(word)
+        if i < 0:
+            return -1
+        self._anagrams = None
+        length = self.length
+        self.store = self.store[:i * length] + self.store[(i + 1) * length:]
+        self.size -= 1
+        self.all = (1 << self.size) - 1
+        for pos, at in enumerate(self.at):
+            for c, m in at.items():
+                at[c] = drop_bit(m, i)
+            self.at_counts[pos][word[pos]] -= 1
+        for c in set(word):
+            self.has_counts[c] -= 1
+        for c, m in self.has.items():
+            self.has[c] = drop_bit(m, i)
+        for key, m in self.repeats.items():
+            self.repeats[key] = drop_bit(m, i)
+        return i
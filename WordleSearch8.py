@@ -144,7 +144,8 @@ def update_results(word_list):
     for row in results_tree.get_children():
         results_tree.delete(row)
     
-    sorted_words = sorted(word_list)
+    # WORDS is sorted and filtering keeps its order, so no re-sort is needed
+    sorted_words = word_list
 
     rows = [sorted_words[i:i+3] for i in range(0, len(sorted_words), 3)]
     
@@ -1,74 +1,577 @@
 import tkinter as tk
+from tkinter import filedialog
+from tkinter import font as tkfont
 from tkinter import ttk
 import copy
+import os
+import sys
+import threading
+from WordleIndex import (ALPHABETS, FIELDS, FILTER_TYPES, WordIndex, build_ranks, describe_violation, drop_bit,
+                         feedback_filters, deep_size, insert_bit, load_frequencies, load_partitions, memory_report,
+                         pattern_regex, rank_columns, ranked, sorted_words, uses_letters, word_list_size, word_matches,
+                         MIN_LENGTH, MAX_LENGTH)
+from WordleTrie import WordTrie
+from WordleSolver import TREE_FILE, load_tree, multi_score, rank_guesses
+from WordleSession import SESSION_FILE, SessionLog, dictionary_source
+from WordleExport import export_chunks, export_format
+from WordleShards import ShardedIndex
+
+# --- Settings ---
+DICTIONARY = "index"   # "index" (bitset index) or "trie" (packed DAWG, lower memory)
+SUGGEST_LIMIT = 300    # largest candidate set scored live when the tree has no entry
+MAX_BOARDS = 8         # Quordle/Octordle-style boards sharing one index
+WATCH_MS = 1000        # how often words.txt is polled for edits (0 turns watching off)
+RESULTS_VIEW = "canvas" # "canvas" (draws only the visible lines) or "tree" (Treeview rows)
+STREAM_WORDS = False   # re-read words.txt for each length instead of keeping every partition (huge lists)
+ALPHABET = None        # an ALPHABETS name such as "spanish" to normalize words and typed letters
+LOW_MEMORY = False     # small machines: one length in memory, no solver tree, capped undo, lean index
+MEMORY_LIMIT_MB = 64   # footprint the low-memory mode trims itself back under (0 = no limit)
+HISTORY_LIMIT = 25     # undo steps kept per board in low-memory mode
+MEMORY_MS = 5000       # how often the footprint is measured and shown (0 turns it off)
+EXTRAS_POLL_MS = 100   # how often a background rank/tree rebuild is checked for completion
+SHARDS = 0             # worker processes that scan multi-million-word partitions in parallel (0 = off)
+if LOW_MEMORY:
+    STREAM_WORDS = True
+    RESULTS_VIEW = "canvas"
 
 # --- Load words ---
-with open("words.txt", "r") as f:
-    WORDS = sorted({w.strip().lower() for w in f if w.strip()})
+# Partitioned by length; only the selected partition is ever indexed or scanned.
+# words.txt may be gzip/bz2/xz-compressed.
+WORDS_FILE = "words.txt"
+LETTERS = ALPHABETS[ALPHABET] if ALPHABET else None
+PARTITIONS = {} if STREAM_WORDS else load_partitions(WORDS_FILE, alphabet=LETTERS)
+INDEXES = {}
+TREES = {}   # length -> (answers mask, {candidate mask: best guess}) from WordleSolver
+
+def select_index(length):
+    if length not in INDEXES:
+        # Both representations replace the word list, so let the list go
+        backend = WordTrie if DICTIONARY == "trie" else WordIndex
+        if STREAM_WORDS:
+            words = sorted_words(WORDS_FILE, length, length, alphabet=LETTERS)
+        else:
+            words = PARTITIONS.pop(length, [])
+        if LOW_MEMORY:
+            # Only the selected length is kept; others are re-read on demand
+            INDEXES.clear()
+            TREES.clear()
+        INDEXES[length] = backend(words, length)
+        if SHARDS and backend is WordIndex and not LOW_MEMORY:
+            INDEXES[length] = ShardedIndex(INDEXES[length], SHARDS)
+        attach_extras(length)
+    return INDEXES[length]
+
+def attach_extras(length):
+    ix = INDEXES[length]
+    build_ranks(ix, load_frequencies("frequencies.txt", length, LETTERS))
+    if LOW_MEMORY:
+        # The tree's mask -> guess lookup can outweigh the index itself
+        TREES[length] = None
+        if hasattr(ix, "drop_optional"):
+            ix.drop_optional()
+    else:
+        TREES[length] = load_tree(TREE_FILE, ix)
+
+extras_generation = {}   # length -> number of the latest background rebuild
+
+def refresh_extras(length):
+    # After an edit the rank columns and the solver tree no longer line up
+    # with the shifted ids, and rebuilding them takes seconds on a big
+    # partition. They are dropped at once (results show alphabetically and
+    # suggestions are scored live) and rebuilt on a worker thread; a
+    # rebuild overtaken by a newer edit is thrown away.
+    ix = INDEXES[length]
+    ix.freq, ix.ranks, ix.orders = None, {}, {}
+    TREES[length] = None
+    generation = extras_generation[length] = extras_generation.get(length, 0) + 1
+    words = ix.words
+    result = []
+
+    def work():
+        try:
+            columns = rank_columns(words, load_frequencies("frequencies.txt", length, LETTERS), length)
+            result.append((columns, None if LOW_MEMORY else load_tree(TREE_FILE, ix)))
+        except Exception:
+            pass   # the index changed underneath; the newer rebuild will land
+
+    def land():
+        if worker.is_alive():
+            root.after(EXTRAS_POLL_MS, land)
+            return
+        if not result or extras_generation[length] != generation or INDEXES.get(length) is not ix:
+            return
+        (ix.freq, ix.ranks, ix.orders), TREES[length] = result[0]
+        if LOW_MEMORY:
+            ix.freq = None
+        if ix is index:
+            for b, mask in enumerate(masks):
+                show_board(b, mask)
+            suggestion_label.config(text=f"Best guess: {suggest_guess() or '-'}")
+
+    worker = threading.Thread(target=work, daemon=True)
+    worker.start()
+    root.after(EXTRAS_POLL_MS, land)
+
+def fold_input(text):
+    # Typed text in the same normalized form as the word list
+    text = text.strip().lower()
+    return text if LETTERS is None else LETTERS.fold_text(text)
+
+# --- Saved session ---
+session_log = SessionLog(SESSION_FILE, HISTORY_LIMIT if LOW_MEMORY else None)
+restored = session_log.load()
+
+DEFAULT_LENGTH = 5 if 5 in PARTITIONS else next(iter(PARTITIONS), 5)
+index = select_index(restored.length if restored else DEFAULT_LENGTH)
 
 # --- Filters storage ---
-filters = {
-    "Not Contains": set(),   # gray tile
-    "At Position": {},       # green tile
-    "Not Position": {}       # yellow tile
-}
+def new_filters():
+    return {
+        "Not Contains": set(),   # gray tile
+        "At Position": {},       # green tile
+        "Not Position": {}       # yellow tile
+    }
+
+# One filters dict, undo history and candidate mask per board. The controls
+# edit the active board; `filters` and `filter_history` point at its state.
+boards = [new_filters()]
+histories = [[]]
+redos = [[]]
+masks = [index.all]
+if restored:
+    boards, histories, redos = restored.boards, restored.histories, restored.redos
+    if LOW_MEMORY:
+        for stack in histories + redos:
+            del stack[:-HISTORY_LIMIT]
+    masks = [index.all] * len(boards)
+active = 0
+filters = boards[active]
+filter_history = histories[active]
 
 FILTER_MAP = {
     "Gray Tile:": "Not Contains",
     "Green Tile:": "At Position",
     "Yellow Tile:": "Not Position"
 }
+# Filter types registered with WordleIndex.register_filter join the tiles
+FILTER_MAP.update({ftype.label: key for key, ftype in FILTER_TYPES.items()})
 REVERSE_FILTER_MAP = {v: k for k, v in FILTER_MAP.items()}
 
-filter_history = []
+ORDER_MAP = {
+    "Alphabetical": None,
+    "Frequency": "Frequency",
+    "Frequency + Info": "Score"
+}
+
+# Known letters in unknown order: index query for each mode
+ANAGRAM_MODES = {
+    "Off": None,
+    "Anagram": "anagrams",          # exactly these letters
+    "Sub-anagram": "sub_anagrams",  # any of these letters, each at most as often as given
+}
+
+# Results are filled in a page at a time as the grid is scrolled
+PAGE_ROWS = 100
+
+# Words that satisfy every revealed hint; in hard mode only these may be guessed
+guess_pool = index.all
 
 # --- Filtering function ---
+def refilter(board):
+    global guess_pool
+    mask = index.match(boards[board])
+    if board == active:
+        guess_pool = mask
+    pattern = fold_input(pattern_value.get())
+    if pattern:
+        try:
+            mask = index.match_pattern(pattern, mask)
+        except ValueError as e:
+            word_count_label.config(text=f"Invalid pattern: {e}")
+            return False
+    mode, letters = anagram_query()
+    if mode and letters:
+        mask &= getattr(index, mode)(letters)
+    show_board(board, mask)
+    return True
+
+def anagram_query():
+    return ANAGRAM_MODES.get(anagram_type.get()), fold_input(letters_value.get())
+
+def show_board(board, mask):
+    masks[board] = mask
+    panes[board].update(ranked(index, index.ids(mask), ORDER_MAP.get(order_type.get())))
+    if board == active:
+        word_count_label.config(text=f"Words: {mask.bit_count()}")
+        heatmap.update(mask)
+
 def apply_filters():
-    filtered = WORDS
-    for letter in filters["Not Contains"]:
-        filtered = [w for w in filtered if letter not in w]
-    for pos, letter in filters["At Position"].items():
-        filtered = [w for w in filtered if pos < len(w) and w[pos] == letter]
-    for pos, letter in filters["Not Position"].items():
-        filtered = [w for w in filtered if letter in w and (pos >= len(w) or w[pos] != letter)]
-    update_results(filtered)
+    if refilter(active):
+        suggestion_label.config(text=f"Best guess: {suggest_guess() or '-'}")
+
+def apply_all():
+    if all([refilter(b) for b in range(len(boards))]):
+        suggestion_label.config(text=f"Best guess: {suggest_guess() or '-'}")
+
+def suggest_guess():
+    if len(boards) == 1:
+        return suggest_single(masks[0])
+    # Finish any board that is down to one word, else score the union of
+    # candidates against every unsolved board at once. In hard mode only
+    # words that fit the active board's hints may be suggested.
+    allowed = guess_pool if hard_mode.get() else index.all
+    open_boards = [(b, m) for b, m in enumerate(masks) if m and len(boards[b]["At Position"]) < index.length]
+    for _, m in open_boards:
+        if m.bit_count() == 1 and m & allowed:
+            return index.word(index.ids(m)[0])
+    live = [m for _, m in open_boards]
+    pool = 0
+    for m in live:
+        pool |= m
+    pool &= allowed
+    if not pool or pool.bit_count() > SUGGEST_LIMIT or not hasattr(index, "split"):
+        return ""
+    return index.word(min(index.ids(pool), key=lambda g: multi_score(index, index.word(g), live)))
+
+def suggest_single(mask):
+    tree = TREES.get(index.length)
+    if tree:
+        answers, lookup = tree
+        guess = lookup.get(mask & answers)
+        if guess and (not hard_mode.get() or index.match_pattern(guess) & guess_pool):
+            return guess
+    n = mask.bit_count()
+    if 0 < n <= SUGGEST_LIMIT and hasattr(index, "split"):
+        return index.word(rank_guesses(index, mask, index.ids(mask))[0])
+    return ""
+
+def check_guess(event=None):
+    guess = fold_input(guess_value.get())
+    if not guess:
+        guess_status.config(text="")
+        return
+    if not guess.isalpha():
+        message = "Letters only"
+    elif len(guess) != index.length:
+        message = f"Guess must have {index.length} letters"
+    elif not index.match_pattern(guess):
+        message = "Not in word list"
+    elif hard_mode.get() and not index.match_pattern(guess) & guess_pool:
+        message = describe_violation(guess, filters)
+    else:
+        message = "OK"
+    guess_status.config(text=message)
 
 # --- GUI callbacks ---
+def push_history():
+    filter_history.append(copy.deepcopy(filters))
+    redos[active].clear()
+    if LOW_MEMORY:
+        del filter_history[:-HISTORY_LIMIT]
+
+def plugin_value(ftype, letter):
+    # The letter entry fills a "letter" field and the second entry any other
+    value = []
+    for field in ftype.fields:
+        text = letter if field == "letter" else position_value.get().strip()
+        try:
+            value.append(FIELDS[field](text))
+        except ValueError:
+            return None
+    return tuple(value)
+
 def add_filter():
     ftype = FILTER_MAP.get(filter_type.get())
-    val = filter_value.get().lower().strip()
+    val = fold_input(filter_value.get())
     if not val:
         return
 
-    filter_history.append(copy.deepcopy(filters))
-
-    if ftype == "Not Contains":
+    if ftype in FILTER_TYPES:
+        value = plugin_value(FILTER_TYPES[ftype], val)
+        if value is None:
+            return
+        push_history()
+        if value not in filters.setdefault(ftype, []):
+            filters[ftype].append(value)
+    elif ftype == "Not Contains":
+        push_history()
         filters[ftype].add(val)
     else:
         try:
             p = int(position_value.get().strip()) - 1
-            filters[ftype][p] = val
         except ValueError:
             return
+        if not 0 <= p < index.length:
+            return
+        push_history()
+        filters[ftype][p] = val
 
     filter_value.delete(0, tk.END)
     position_value.delete(0, tk.END)
     update_filter_list()
     apply_filters()
+    session_log.record("set", board=active, filters=filters, mask=masks[active])
+
+def apply_guess(guess, pattern):
+    # A whole row of tiles at once: one history entry, one refilter
+    if hard_mode.get() and not index.match_pattern(guess) & guess_pool:
+        guess_status.config(text=describe_violation(guess, filters) or "Not allowed in hard mode")
+        return False
+    push_history()
+    feedback_filters(guess, pattern, filters)
+    update_filter_list()
+    apply_filters()
+    session_log.record("set", board=active, filters=filters, mask=masks[active])
+    return True
 
 def clear_filters():
-    filter_history.append(copy.deepcopy(filters))
+    push_history()
     for f in filters.values():
         f.clear()
+    pattern_value.delete(0, tk.END)
     update_filter_list()
-    update_results(WORDS)
+    apply_all()
+    session_log.record("set", board=active, filters=filters)
+    save_options()
 
 def undo_filter():
     if filter_history:
         global filters
-        filters = filter_history.pop()
+        redos[active].append(filters)
+        filters = boards[active] = filter_history.pop()
         update_filter_list()
         apply_filters()
+        session_log.record("undo", board=active, mask=masks[active])
+
+def redo_filter():
+    if redos[active]:
+        global filters
+        filter_history.append(filters)
+        filters = boards[active] = redos[active].pop()
+        update_filter_list()
+        apply_filters()
+        session_log.record("redo", board=active, mask=masks[active])
+
+def current_options():
+    return dict(pattern=pattern_value.get().strip(), order=order_type.get(), hard=hard_mode.get(),
+                anagram=anagram_type.get(), letters=letters_value.get().strip())
+
+def save_options():
+    session_log.record("options", masks=masks, **current_options())
+
+def save_new_game():
+    # The masks shown are filtered by the options, so a new journal has to
+    # record those too
+    session_log.record("start", length=index.length, boards=len(boards),
+                       source=dictionary_source(WORDS_FILE), masks=masks, **current_options())
+
+def select_board(event=None):
+    global active, filters, filter_history, guess_pool
+    active = int(board_value.get()) - 1
+    filters = boards[active]
+    filter_history = histories[active]
+    guess_pool = index.match(filters)
+    update_filter_list()
+    word_count_label.config(text=f"Words: {masks[active].bit_count()}")
+    heatmap.update(masks[active])
+    check_guess()
+
+def change_board_count():
+    try:
+        count = int(board_count.get())
+    except ValueError:
+        return
+    if count == len(boards) or not 1 <= count <= MAX_BOARDS:
+        return
+    del boards[count:], histories[count:], redos[count:], masks[count:]
+    while len(boards) < count:
+        boards.append(new_filters())
+        histories.append([])
+        redos.append([])
+        masks.append(index.all)
+    build_panes()
+    board_value.config(values=[str(b + 1) for b in range(count)])
+    if active >= count:
+        board_value.set(str(count))
+    select_board()
+    apply_all()
+    session_log.record("boards", count=count, masks=masks)
+
+def change_length():
+    global index
+    try:
+        length = int(length_value.get())
+    except ValueError:
+        return
+    if length == index.length or not MIN_LENGTH <= length <= MAX_LENGTH:
+        return
+    # Positions from another length don't carry over, so start fresh boards
+    index = select_index(length)
+    for b in range(len(boards)):
+        histories[b].clear()
+        redos[b].clear()
+        for f in boards[b].values():
+            f.clear()
+    pattern_value.delete(0, tk.END)
+    tile_board.reset()
+    update_filter_list()
+    apply_all()
+    save_new_game()
+
+def watch_words():
+    global words_source
+    source = dictionary_source(WORDS_FILE)
+    if source != words_source and source is not None:
+        words_source = source
+        reload_words()
+    root.after(WATCH_MS, watch_words)
+
+def reload_words():
+    # Folds edits to words.txt into the loaded indexes word by word. Board
+    # masks get the same bit shifts, and only the added words are tested
+    # against each board's filters, so nothing is refiltered from scratch.
+    # Ranks and the solver tree catch up in the background.
+    global index, guess_pool
+    if STREAM_WORDS:
+        fresh = load_partitions(WORDS_FILE, min(INDEXES), max(INDEXES), alphabet=LETTERS)
+    else:
+        fresh = load_partitions(WORDS_FILE, alphabet=LETTERS)
+        for length in set(PARTITIONS) | set(fresh):
+            if length not in INDEXES:
+                PARTITIONS[length] = fresh.get(length, [])
+    rebuilt = False
+    for length, ix in INDEXES.items():
+        words = fresh.get(length, [])
+        if not hasattr(ix, "insert"):
+            # The packed trie can't be edited in place
+            INDEXES[length] = WordTrie(words, length)
+            rebuilt = rebuilt or ix is index
+        else:
+            current = ix is index
+            old = set(ix.words)
+            new = set(words)
+            if old == new:
+                continue
+            pattern = fold_input(pattern_value.get())
+            regex = pattern_regex(pattern) if pattern and current else None
+            mode, letters = anagram_query()
+            for w in sorted(old - new):
+                i = ix.remove(w)
+                if current:
+                    masks[:] = [drop_bit(m, i) for m in masks]
+            for w in sorted(new - old):
+                i = ix.insert(w)
+                if current:
+                    fits = ((regex is None or regex.fullmatch(w))
+                            and not (mode and letters and not uses_letters(w, letters, mode == "anagrams")))
+                    masks[:] = [insert_bit(m, i, fits and word_matches(w, boards[b])) for b, m in enumerate(masks)]
+        refresh_extras(length)
+    index = select_index(index.length)
+    if rebuilt:
+        apply_all()
+    else:
+        guess_pool = index.match(filters)
+        for b, mask in enumerate(masks):
+            show_board(b, mask)
+        suggestion_label.config(text=f"Best guess: {suggest_guess() or '-'}")
+    session_log.record("source", source=words_source, masks=masks)
+
+export_job = None
+
+def export_results(to_clipboard=False):
+    # Streams the active board's results, in the shown order, one chunk per
+    # turn of the event loop, so even a huge export never blocks Tk or
+    # builds the whole text in memory
+    global export_job
+    if export_job is not None:
+        return
+    results = panes[active].results
+    if to_clipboard:
+        out = None
+        root.clipboard_clear()
+        write = root.clipboard_append
+        fmt, where = "txt", "clipboard"
+    else:
+        path = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[
+            ("Text", "*.txt"), ("CSV", "*.csv"), ("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            out = open(path, "w", encoding="utf-8", newline="")
+        except OSError as e:
+            word_count_label.config(text=f"Export failed: {e}")
+            return
+        write = out.write
+        fmt, where = export_format(path), os.path.basename(path)
+    pieces = export_chunks(index, results, fmt, export_extras.get())
+
+    def step():
+        global export_job
+        try:
+            piece = next(pieces, None)
+            if piece is not None:
+                write(piece)
+            elif out:
+                out.close()
+        except OSError as e:
+            # A full disk or a file gone bad: give up so the next export can run
+            export_job = None
+            if out:
+                try:
+                    out.close()
+                except OSError:
+                    pass
+            word_count_label.config(text=f"Export failed: {e}")
+            return
+        if piece is None:
+            export_job = None
+            word_count_label.config(text=f"Words: {len(results)} (exported to {where})")
+            return
+        export_job = root.after(1, step)
+
+    export_job = root.after_idle(step)
+
+def memory_footprint():
+    # Bytes per component, measured by walking the live objects; word lists
+    # and result ids are sized arithmetically, walking a million strs or
+    # ints every few seconds would stall the GUI. Tk keeps its items on the
+    # C side, so those are counted rather than sized.
+    seen = set()
+    usage = {
+        "indexes": sum(sum(memory_report(part, seen).values())
+                       for ix in INDEXES.values() for part in {ix, getattr(ix, "index", ix)}),
+        "words": sys.getsizeof(PARTITIONS) + sum(word_list_size(words) for words in PARTITIONS.values()),
+        "trees": deep_size(TREES, seen),
+        "history": deep_size([histories, redos], seen),
+        "results": sum(deep_size(pane.results, seen) for pane in panes),
+    }
+    items = len(filters_list.get_children())
+    for pane in panes:
+        items += len(pane.canvas.find_all()) if hasattr(pane, "canvas") else len(pane.tree.get_children())
+    return usage, items
+
+def trim_memory():
+    # Gives back what can be rebuilt or lived without, cheapest loss first
+    PARTITIONS.clear()
+    for length in [n for n in INDEXES if n != index.length]:
+        del INDEXES[length]
+        TREES.pop(length, None)
+    TREES[index.length] = None
+    for stack in histories + redos:
+        del stack[:len(stack) // 2]
+
+def report_memory():
+    usage, items = memory_footprint()
+    total = sum(usage.values())
+    limit = MEMORY_LIMIT_MB << 20
+    if LOW_MEMORY and limit and total > limit:
+        trim_memory()
+        usage, items = memory_footprint()
+        total = sum(usage.values())
+    parts = ", ".join(f"{name} {size / 2 ** 20:.1f}" for name, size in usage.items() if size)
+    budget = f" of {MEMORY_LIMIT_MB} MB" if LOW_MEMORY and limit else " MB"
+    memory_label.config(text=f"Memory: {total / 2 ** 20:.1f}{budget} ({parts}); {items} UI items")
+    root.after(MEMORY_MS, report_memory)
 
 def update_filter_list():
     filters_list.delete(*filters_list.get_children())
@@ -85,15 +588,256 @@ def update_filter_list():
         filters_list.insert("", "end", values=(
             REVERSE_FILTER_MAP["Not Position"], letter, str(pos + 1)
         ))
+    for key, values in filters.items():
+        ftype = FILTER_TYPES.get(key)
+        for value in values if ftype else ():
+            shown = [str(v + 1) if f == "position" else str(v) for f, v in zip(ftype.fields, value)]
+            filters_list.insert("", "end", values=(ftype.label, shown[0], " ".join(shown[1:])))
+
+class ResultsPane:
+    # One board's result grid with its own scrollbar and paging state
+    def __init__(self, parent, title, columns):
+        self.frame = ttk.Frame(parent)
+        self.columns = columns
+        self.label = ttk.Label(self.frame, text=title)
+        self.label.grid(row=0, column=0, columnspan=2, sticky="w")
+        cols = [f"Col{c + 1}" for c in range(columns)]
+        self.tree = ttk.Treeview(self.frame, columns=cols, show="", height=15)
+        for col in cols:
+            self.tree.column(col, anchor="center", stretch=True, width=80)
+        self.tree.grid(row=1, column=0, sticky="nsew")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+        self.frame.grid_rowconfigure(1, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.title = title
+        self.results = ranked(index, [])
+        self.shown_rows = 0
+
+    def update(self, results):
+        self.tree.delete(*self.tree.get_children())
+        self.results = results
+        self.shown_rows = 0
+        self.show_more()
+        if self.title:
+            self.label.config(text=f"{self.title}: {len(results)}")
+
+    def show_more(self):
+        # Ids stay integers until they are turned into text for a row
+        n = self.columns
+        start = self.shown_rows * n
+        ids = self.results.page(start, start + PAGE_ROWS * n)
+        word = index.word
+        for i in range(0, len(ids), n):
+            r = [word(j) for j in ids[i:i+n]]
+            self.tree.insert("", "end", values=r + [""] * (n - len(r)))
+        self.shown_rows += (len(ids) + n - 1) // n
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9 and self.shown_rows * self.columns < len(self.results):
+            self.show_more()
+
+class CanvasPane:
+    # Drop-in for ResultsPane that draws the results as text on a Canvas.
+    # Only the lines in view are ever turned into words and drawn, so the
+    # cost of a redraw depends on the window size, not on the number of
+    # candidates. Words flow into as many columns as the width allows.
+    def __init__(self, parent, title, columns=None):
+        self.frame = ttk.Frame(parent)
+        self.label = ttk.Label(self.frame, text=title)
+        self.label.grid(row=0, column=0, columnspan=2, sticky="w")
+        self.font = tkfont.nametofont("TkFixedFont")
+        self.line = self.font.metrics("linespace") + 2
+        self.canvas = tk.Canvas(self.frame, height=15 * self.line, width=260, background="white",
+                                highlightthickness=0)
+        self.canvas.grid(row=1, column=0, sticky="nsew")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        self.scrollbar.grid(row=1, column=1, sticky="ns")
+        self.frame.grid_rowconfigure(1, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+        self.canvas.bind("<Configure>", self.reflow)
+        self.canvas.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.title = title
+        self.results = ranked(index, [])
+        self.columns = 1
+        self.top = 0   # first line in view
+
+    def update(self, results):
+        self.results = results
+        self.top = 0
+        self.reflow()
+        if self.title:
+            self.label.config(text=f"{self.title}: {len(results)}")
+
+    def rows(self):
+        return (len(self.results) + self.columns - 1) // self.columns
 
-def update_results(word_list):
-    results_tree.delete(*results_tree.get_children())
-    rows = [word_list[i:i+3] for i in range(0, len(word_list), 3)]
-    for r in rows:
-        results_tree.insert("", "end", values=r + [""] * (3 - len(r)))
-    word_count_label.config(text=f"Words: {len(word_list)}")
+    def visible(self):
+        return max(1, self.canvas.winfo_height() // self.line)
+
+    def reflow(self, event=None):
+        # Keep the first word in view in view when the column count changes
+        first = self.top * self.columns
+        cell = self.font.measure("m" * (index.length + 2))
+        self.columns = max(1, self.canvas.winfo_width() // cell)
+        self.top = first // self.columns
+        self.draw()
+
+    def draw(self):
+        self.canvas.delete("all")
+        rows, visible, n = self.rows(), self.visible(), self.columns
+        self.top = max(0, min(self.top, rows - visible))
+        ids = self.results.page(self.top * n, (self.top + visible) * n)
+        width = index.length + 2
+        word = index.word
+        for r in range(0, len(ids), n):
+            text = "".join(word(i).ljust(width) for i in ids[r:r + n])
+            self.canvas.create_text(4, (r // n) * self.line + 1, anchor="nw", text=text, font=self.font)
+        if rows:
+            self.scrollbar.set(self.top / rows, min(1.0, (self.top + visible) / rows))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll(self, amount, what):
+        self.top += amount * (self.visible() if what == "pages" else 1)
+        self.draw()
+
+    def yview(self, *args):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * self.rows())
+            self.draw()
+        elif args[0] == "scroll":
+            self.scroll(int(args[1]), args[2])
+
+class Heatmap:
+    # Letters down, positions across: each cell is shaded by the share of
+    # the active board's candidates with that letter in that position. The
+    # grid is laid out once per alphabet and length; a refilter only
+    # recolours it.
+    CELL = 24
+    HOT = (0x6a, 0xaa, 0x64)
+
+    def __init__(self, parent):
+        self.frame = ttk.Frame(parent)
+        ttk.Label(self.frame, text="Letters by position").grid(row=0, column=0, sticky="w")
+        self.canvas = tk.Canvas(self.frame, background="white", highlightthickness=0)
+        self.canvas.grid(row=1, column=0, sticky="n")
+        self.shape = None
+        self.cells = {}
+        self.shown = {}
+
+    def layout(self, letters, length):
+        self.canvas.delete("all")
+        self.cells = {}
+        self.shown = {}
+        size = self.CELL
+        self.canvas.config(width=size * (length + 1), height=size * (len(letters) + 1))
+        for pos in range(length):
+            self.canvas.create_text(size * (pos + 1.5), size / 2, text=str(pos + 1))
+        for row, c in enumerate(letters, 1):
+            self.canvas.create_text(size / 2, size * (row + 0.5), text=c.upper())
+            for pos in range(length):
+                x, y = size * (pos + 1), size * row
+                rect = self.canvas.create_rectangle(x, y, x + size - 1, y + size - 1, outline="#d3d6da")
+                text = self.canvas.create_text(x + size / 2, y + size / 2, font=("TkDefaultFont", 7))
+                self.cells[c, pos] = (rect, text)
+        self.shape = (letters, length)
+
+    def update(self, mask):
+        letters = "".join(sorted(index.letters))
+        if self.shape != (letters, index.length):
+            self.layout(letters, index.length)
+        counts = index.letter_counts(mask)
+        total = mask.bit_count() or 1
+        for key, (rect, text) in self.cells.items():
+            n = counts[key[1]].get(key[0], 0)
+            if self.shown.get(key) == n:
+                continue   # only changed cells go back to Tk
+            self.shown[key] = n
+            share = n / total
+            fill = "#" + "".join(f"{round(255 - (255 - h) * share):02x}" for h in self.HOT)
+            self.canvas.itemconfigure(rect, fill=fill)
+            self.canvas.itemconfigure(text, text=str(n) if n else "")
+
+class TileBoard:
+    # Wordle-style row: type the guess, click tiles to cycle grey -> yellow
+    # -> green, and Enter applies the whole row to the active board
+    CELL = 40
+    COLORS = ("#787c7e", "#c9b458", "#6aaa64")   # grey, yellow, green
+
+    def __init__(self, parent):
+        self.canvas = tk.Canvas(parent, height=self.CELL + 4, highlightthickness=1, takefocus=1)
+        self.canvas.bind("<Button-1>", self.click)
+        self.canvas.bind("<Key>", self.key)
+        self.letters = []
+        self.colors = []
+        self.reset()
+
+    def reset(self):
+        self.letters = []
+        self.colors = [0] * index.length
+        self.canvas.config(width=(self.CELL + 4) * index.length + 4)
+        self.draw()
+
+    def draw(self):
+        self.canvas.delete("all")
+        size = self.CELL
+        for pos in range(index.length):
+            x = 4 + pos * (size + 4)
+            typed = pos < len(self.letters)
+            fill = self.COLORS[self.colors[pos]] if typed else "white"
+            self.canvas.create_rectangle(x, 2, x + size, 2 + size, fill=fill, outline="#d3d6da", width=2)
+            if typed:
+                self.canvas.create_text(x + size / 2, 2 + size / 2, text=self.letters[pos].upper(),
+                                        fill="white", font=("TkDefaultFont", 16, "bold"))
+
+    def click(self, event):
+        self.canvas.focus_set()
+        pos = int(self.canvas.canvasx(event.x) - 4) // (self.CELL + 4)
+        if 0 <= pos < len(self.letters):
+            self.colors[pos] = (self.colors[pos] + 1) % 3
+            self.draw()
+
+    def key(self, event):
+        if event.keysym == "Return":
+            if len(self.letters) == index.length:
+                pattern = sum(c * 3 ** pos for pos, c in enumerate(self.colors))
+                if apply_guess("".join(self.letters), pattern):
+                    self.reset()
+        elif event.keysym == "BackSpace":
+            if self.letters:
+                self.letters.pop()
+                self.colors[len(self.letters)] = 0
+                self.draw()
+        elif event.char and len(self.letters) < index.length:
+            c = fold_input(event.char)
+            if len(c) == 1 and validate_letter(c):
+                self.letters.append(c)
+                self.draw()
+
+panes = []
+
+def build_panes():
+    for pane in panes:
+        pane.frame.destroy()
+    panes.clear()
+    count = len(boards)
+    for b in range(count):
+        pane_class = CanvasPane if RESULTS_VIEW == "canvas" else ResultsPane
+        pane = pane_class(results_frame, f"Board {b + 1}" if count > 1 else "", 3 if count == 1 else 1)
+        pane.frame.grid(row=0, column=b, sticky="nsew", padx=(0, 4))
+        panes.append(pane)
+    for c in range(MAX_BOARDS):
+        results_frame.grid_columnconfigure(c, weight=1 if c < count else 0)
 
 def validate_letter(new_value):
+    if LETTERS is not None:
+        return new_value == "" or LETTERS.letter(new_value) is not None
     return new_value == "" or (len(new_value) == 1 and new_value.isalpha())
 
 # --- GUI setup ---
@@ -114,12 +858,19 @@ filter_value = ttk.Entry(inputs_frame, width=4, validate="key", validatecommand=
 filter_value.grid(row=0, column=1, padx=(0, 2), sticky="w")
 
 position_frame = ttk.Frame(inputs_frame)
-ttk.Label(position_frame, text="Position:").grid(row=0, column=0, padx=(0, 4))
+position_label = ttk.Label(position_frame, text="Position:")
+position_label.grid(row=0, column=0, padx=(0, 4))
 position_value = ttk.Entry(position_frame, width=4)
 position_value.grid(row=0, column=1)
 
 def update_position_visibility(event=None):
-    if filter_type.get() in ["Green Tile:", "Yellow Tile:"]:
+    ftype = FILTER_TYPES.get(FILTER_MAP.get(filter_type.get()))
+    if ftype:
+        extra = [f for f in ftype.fields if f != "letter"]
+    else:
+        extra = ["position"] if filter_type.get() in ["Green Tile:", "Yellow Tile:"] else []
+    if extra:
+        position_label.config(text=f"{extra[0].title()}:")
         if not position_frame.winfo_ismapped():
             position_frame.grid(row=0, column=2, padx=2, sticky="w")
     else:
@@ -128,11 +879,80 @@ def update_position_visibility(event=None):
 filter_type.bind("<<ComboboxSelected>>", update_position_visibility)
 update_position_visibility()
 
+length_frame = ttk.Frame(inputs_frame)
+length_frame.grid(row=0, column=3, padx=2, sticky="w")
+ttk.Label(length_frame, text="Letters:").grid(row=0, column=0, padx=(0, 4))
+length_value = ttk.Spinbox(length_frame, from_=MIN_LENGTH, to=MAX_LENGTH, width=3, command=change_length)
+length_value.set(DEFAULT_LENGTH)
+length_value.grid(row=0, column=1)
+length_value.bind("<Return>", lambda e: change_length())
+
+board_frame = ttk.Frame(inputs_frame)
+board_frame.grid(row=0, column=4, padx=2, sticky="w")
+ttk.Label(board_frame, text="Boards:").grid(row=0, column=0, padx=(6, 4))
+board_count = ttk.Spinbox(board_frame, from_=1, to=MAX_BOARDS, width=3, command=change_board_count)
+board_count.set(1)
+board_count.grid(row=0, column=1)
+board_count.bind("<Return>", lambda e: change_board_count())
+ttk.Label(board_frame, text="Edit:").grid(row=0, column=2, padx=(6, 4))
+board_value = ttk.Combobox(board_frame, values=["1"], state="readonly", width=3)
+board_value.set("1")
+board_value.grid(row=0, column=3)
+board_value.bind("<<ComboboxSelected>>", select_board)
+
+pattern_frame = ttk.Frame(inputs_frame)
+pattern_frame.grid(row=1, column=0, columnspan=4, pady=(5, 0), sticky="w")
+ttk.Label(pattern_frame, text="Pattern:").grid(row=0, column=0, padx=(2, 4))
+pattern_value = ttk.Entry(pattern_frame, width=20)
+pattern_value.grid(row=0, column=1)
+pattern_value.bind("<Return>", lambda e: (apply_all(), save_options()))
+ttk.Label(pattern_frame, text="Order:").grid(row=0, column=2, padx=(10, 4))
+order_type = ttk.Combobox(pattern_frame, values=list(ORDER_MAP.keys()), state="readonly", width=16)
+order_type.set("Alphabetical")
+order_type.grid(row=0, column=3)
+order_type.bind("<<ComboboxSelected>>", lambda e: (apply_all(), save_options()))
+
+hard_mode = tk.BooleanVar(value=False)
+ttk.Checkbutton(pattern_frame, text="Hard mode", variable=hard_mode,
+                command=lambda: (apply_filters(), check_guess(), save_options())).grid(row=0, column=4, padx=(10, 0))
+ttk.Label(pattern_frame, text="Guess:").grid(row=0, column=5, padx=(10, 4))
+guess_value = ttk.Entry(pattern_frame, width=12)
+guess_value.grid(row=0, column=6)
+guess_value.bind("<Return>", check_guess)
+guess_status = ttk.Label(pattern_frame, text="")
+guess_status.grid(row=0, column=7, padx=(4, 0))
+
+anagram_frame = ttk.Frame(inputs_frame)
+anagram_frame.grid(row=3, column=0, columnspan=6, pady=(8, 0), sticky="w")
+ttk.Label(anagram_frame, text="Letters:").grid(row=0, column=0, padx=(2, 4))
+letters_value = ttk.Entry(anagram_frame, width=16)
+letters_value.grid(row=0, column=1)
+letters_value.bind("<Return>", lambda e: (apply_all(), save_options()))
+ttk.Label(anagram_frame, text="Use:").grid(row=0, column=2, padx=(10, 4))
+anagram_type = ttk.Combobox(anagram_frame, values=list(ANAGRAM_MODES), state="readonly", width=12)
+anagram_type.set("Off")
+anagram_type.grid(row=0, column=3)
+anagram_type.bind("<<ComboboxSelected>>", lambda e: (apply_all(), save_options()))
+
+tiles_frame = ttk.Frame(inputs_frame)
+tiles_frame.grid(row=2, column=0, columnspan=6, pady=(8, 0), sticky="w")
+ttk.Label(tiles_frame, text="Tiles:").grid(row=0, column=0, padx=(2, 4))
+tile_board = TileBoard(tiles_frame)
+tile_board.canvas.grid(row=0, column=1)
+ttk.Label(tiles_frame, text="type a guess, click tiles to colour them, Enter to apply").grid(
+    row=0, column=2, padx=(8, 0))
+
 buttons_frame = ttk.Frame(inputs_frame)
 buttons_frame.grid(row=0, column=6, sticky="e")
 ttk.Button(buttons_frame, text="Add Filter", command=add_filter).grid(row=0, column=0, padx=2)
 ttk.Button(buttons_frame, text="Clear Filters", command=clear_filters).grid(row=0, column=1, padx=2)
-ttk.Button(buttons_frame, text="Undo", command=undo_filter).grid(row=0, column=2, padx=(2, 15))
+ttk.Button(buttons_frame, text="Undo", command=undo_filter).grid(row=0, column=2, padx=2)
+ttk.Button(buttons_frame, text="Redo", command=redo_filter).grid(row=0, column=3, padx=(2, 15))
+ttk.Button(buttons_frame, text="Export...", command=export_results).grid(row=1, column=0, padx=2, pady=(5, 0))
+ttk.Button(buttons_frame, text="Copy", command=lambda: export_results(True)).grid(row=1, column=1, padx=2, pady=(5, 0))
+export_extras = tk.BooleanVar(value=False)
+ttk.Checkbutton(buttons_frame, text="Freq/score columns", variable=export_extras).grid(
+    row=1, column=2, columnspan=2, sticky="w", padx=2, pady=(5, 0))
 
 # --- Filter list ---
 filters_frame = ttk.Frame(root)
@@ -153,25 +973,52 @@ filters_frame.grid_columnconfigure(0, weight=1)
 # --- Word count ---
 word_count_label = ttk.Label(root, text="Words: 0")
 word_count_label.grid(row=3, column=0, sticky="w", padx=20, pady=5)
+suggestion_label = ttk.Label(root, text="Best guess: -")
+suggestion_label.grid(row=3, column=0, sticky="e", padx=20, pady=5)
+memory_label = ttk.Label(root, text="")
+memory_label.grid(row=4, column=0, columnspan=2, sticky="w", padx=20, pady=(0, 5))
+
+# --- Letter heatmap ---
+heatmap = Heatmap(root)
+heatmap.frame.grid(row=1, column=1, rowspan=2, sticky="n", padx=(0, 20), pady=(0, 5))
 
 # --- Results ---
 results_frame = ttk.Frame(root)
 results_frame.grid(row=2, column=0, sticky="nsew", padx=(20, 10), pady=(10, 0))
-
-results_tree = ttk.Treeview(results_frame, columns=("Col1", "Col2", "Col3"), show="", height=15)
-for col in ("Col1", "Col2", "Col3"):
-    results_tree.column(col, anchor="center", stretch=True)
-results_tree.grid(row=0, column=0, sticky="nsew")
-
-scrollbar = ttk.Scrollbar(results_frame, orient="vertical", command=results_tree.yview)
-results_tree.configure(yscrollcommand=scrollbar.set)
-scrollbar.grid(row=0, column=1, sticky="ns")
-
 results_frame.grid_rowconfigure(0, weight=1)
-results_frame.grid_columnconfigure(0, weight=1)
+build_panes()
 
 # --- Initial update ---
-update_results(WORDS)
+words_source = dictionary_source(WORDS_FILE)
+if restored:
+    # Put the controls back, then show the cached candidate masks as they
+    # were unless the word list has changed since they were saved
+    length_value.set(index.length)
+    board_count.set(len(boards))
+    board_value.config(values=[str(b + 1) for b in range(len(boards))])
+    pattern_value.insert(0, restored.pattern)
+    order_type.set(restored.order if restored.order in ORDER_MAP else "Alphabetical")
+    hard_mode.set(restored.hard)
+    anagram_type.set(restored.anagram if restored.anagram in ANAGRAM_MODES else "Off")
+    letters_value.insert(0, restored.letters)
+    select_board()
+    if restored.source == words_source and None not in restored.masks:
+        guess_pool = index.match(filters)
+        for b, mask in enumerate(restored.masks):
+            show_board(b, mask)
+        suggestion_label.config(text=f"Best guess: {suggest_guess() or '-'}")
+    else:
+        # Recomputed against the new list, so the next start can use them
+        apply_all()
+        session_log.record("source", source=words_source, masks=masks)
+else:
+    apply_all()
+    save_new_game()
+
+if WATCH_MS:
+    root.after(WATCH_MS, watch_words)
+if MEMORY_MS:
+    root.after_idle(report_memory)
 
 # --- Expandable layout ---
 root.grid_rowconfigure(1, weight=1)
@@ -0,0 +1,228 @@
+import copy
+import json
+import os
+
+SESSION_FILE = "session.jsonl"
+COMPACT_LINES = 500       # rewrite the journal as one snapshot once it grows past this
+COMPACT_BYTES = 4 << 20   # ... or once this much has been appended since the last snapshot
+
+
+# --- Filters <-> JSON ---
+TILE_FILTERS = ("Not Contains", "At Position", "Not Position")
+
+def filters_to_json(filters):
+    data = {
+        "Not Contains": sorted(filters["Not Contains"]),
+        "At Position": {str(p): c for p, c in filters["At Position"].items()},
+        "Not Position": {str(p): c for p, c in filters["Not Position"].items()},
+    }
+    # Registered filter types keep a list of value tuples
+    for key, values in filters.items():
+        if key not in TILE_FILTERS and values:
+            data[key] = [list(v) for v in values]
+    return data
+
+def filters_from_json(data):
+    filters = {
+        "Not Contains": set(data.get("Not Contains", ())),
+        "At Position": {int(p): c for p, c in data.get("At Position", {}).items()},
+        "Not Position": {int(p): c for p, c in data.get("Not Position", {}).items()},
+    }
+    for key, values in data.items():
+        if key not in TILE_FILTERS:
+            filters[key] = [tuple(v) for v in values]
+    return filters
+
+def empty_filters():
+    return filters_from_json({})
+
+
+# --- Replayed state ---
+class Session:
+    # Everything needed to put the app back where it was: per-board filters,
+    # undo and redo stacks and the last candidate mask shown for each board,
+    # plus the shared options. `source` identifies the dictionary the masks
+    # were computed against, so stale masks can be recomputed instead.
+    def __init__(self, length=5, board_count=1, source=None):
+        self.length = length
+        self.source = source
+        self.pattern = ""
+        self.order = "Alphabetical"
+        self.hard = False
+        self.anagram = "Off"
+        self.letters = ""
+        self.boards = [empty_filters() for _ in range(board_count)]
+        self.histories = [[] for _ in range(board_count)]
+        self.redos = [[] for _ in range(board_count)]
+        self.masks = [None] * board_count
+
+    def resize(self, count):
+        for name in ("boards", "histories", "redos", "masks"):
+            del getattr(self, name)[count:]
+        while len(self.boards) < count:
+            self.boards.append(empty_filters())
+            self.histories.append([])
+            self.redos.append([])
+            self.masks.append(None)
+
+    def apply(self, event):
+        op = event["op"]
+        b = event.get("board", 0)
+        if op == "start":
+            # A new game keeps the options that were in effect
+            self.__init__(event["length"], event["boards"], event.get("source"))
+            self._options(event)
+        elif op == "state":
+            self.__init__(event["length"], len(event["boards"]), event.get("source"))
+            self._options(event)
+            for i, board in enumerate(event["boards"]):
+                self.boards[i] = filters_from_json(board["filters"])
+                self.histories[i] = [filters_from_json(f) for f in board["history"]]
+                self.redos[i] = [filters_from_json(f) for f in board["redo"]]
+                self.masks[i] = _mask(board.get("mask"))
+        elif op == "set":
+            self.histories[b].append(self.boards[b])
+            self.redos[b].clear()
+            self.boards[b] = filters_from_json(event["filters"])
+        elif op == "undo" and self.histories[b]:
+            self.redos[b].append(self.boards[b])
+            self.boards[b] = self.histories[b].pop()
+        elif op == "redo" and self.redos[b]:
+            self.histories[b].append(self.boards[b])
+            self.boards[b] = self.redos[b].pop()
+        elif op == "boards":
+            self.resize(event["count"])
+        elif op == "source":
+            self.source = event.get("source")
+        elif op == "options":
+            self._options(event)
+        if isinstance(event.get("masks"), dict):
+            # Only the boards whose mask changed
+            for b, m in event["masks"].items():
+                self.masks[int(b)] = _mask(m)
+        elif "masks" in event:
+            self.masks = [_mask(m) for m in event["masks"]]
+        elif "mask" in event and op != "state":
+            self.masks[b] = _mask(event["mask"])
+
+    def _options(self, event):
+        self.pattern = event.get("pattern", self.pattern)
+        self.order = event.get("order", self.order)
+        self.hard = event.get("hard", self.hard)
+        self.anagram = event.get("anagram", self.anagram)
+        self.letters = event.get("letters", self.letters)
+
+    def snapshot(self):
+        return {
+            "op": "state",
+            "length": self.length,
+            "source": self.source,
+            "pattern": self.pattern,
+            "order": self.order,
+            "hard": self.hard,
+            "anagram": self.anagram,
+            "letters": self.letters,
+            "boards": [{
+                "filters": filters_to_json(self.boards[i]),
+                "history": [filters_to_json(f) for f in self.histories[i]],
+                "redo": [filters_to_json(f) for f in self.redos[i]],
+                "mask": _hex(self.masks[i]),
+            } for i in range(len(self.boards))],
+        }
+
+def _hex(mask):
+    return None if mask is None else format(mask, "x")
+
+def _mask(text):
+    return None if text is None else int(text, 16)
+
+def dictionary_source(path):
+    # Cheap fingerprint of the word list the cached masks belong to
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [os.path.abspath(path), st.st_size, st.st_mtime_ns]
+
+
+# --- Journal ---
+class SessionLog:
+    # Append-only JSON-lines journal: one small line per user action, so
+    # saving never rewrites the file. Every line is also replayed into
+    # `session`, which lets a line carry only the board masks that changed
+    # and lets a journal that has grown long be compacted into a single
+    # snapshot line, at load or while the app runs. `history_limit` caps
+    # the undo and redo steps that mirror keeps.
+    def __init__(self, path=SESSION_FILE, history_limit=None):
+        self.path = path
+        self.history_limit = history_limit
+        self.lines = 0
+        self.bytes = 0
+        self.session = None
+
+    def load(self):
+        session = None
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        break   # a torn last line from a crash; keep what came before
+                    if session is None:
+                        if event.get("op") not in ("start", "state"):
+                            return None
+                        session = Session()
+                    session.apply(event)
+                    self.lines += 1
+                    self.bytes += len(line)
+        except OSError:
+            return None
+        self.session = session
+        if session is None:
+            return None
+        if self.lines > COMPACT_LINES or self.bytes > COMPACT_BYTES:
+            self.rewrite(session)
+        # The caller adopts the returned lists and edits them directly, so
+        # the mirror has to be a separate copy
+        return copy.deepcopy(session)
+
+    def record(self, op, **fields):
+        fields = {"op": op, **fields}
+        if self.session is None or op == "start":
+            self.session = Session()
+        if "mask" in fields:
+            fields["mask"] = _hex(fields["mask"])
+        if "masks" in fields:
+            if op == "start":
+                fields["masks"] = [_hex(m) for m in fields["masks"]]
+            else:
+                old = self.session.masks
+                changed = {str(b): _hex(m) for b, m in enumerate(fields["masks"]) if b >= len(old) or old[b] != m}
+                if changed:
+                    fields["masks"] = changed
+                else:
+                    del fields["masks"]
+        if "filters" in fields:
+            fields["filters"] = filters_to_json(fields["filters"])
+        self.session.apply(fields)
+        if self.history_limit is not None:
+            for stack in self.session.histories + self.session.redos:
+                del stack[:-self.history_limit]
+        line = json.dumps(fields, separators=(",", ":")) + "\n"
+        # A new game starts a new journal; everything else is appended
+        with open(self.path, "w" if op == "start" else "a") as f:
+            f.write(line)
+        self.lines = 1 if op == "start" else self.lines + 1
+        self.bytes = len(line) if op == "start" else self.bytes + len(line)
+        if self.lines > COMPACT_LINES or self.bytes > COMPACT_BYTES:
+            self.rewrite(self.session)
+
+    def rewrite(self, session):
+        tmp = self.path + ".tmp"
+        line = json.dumps(session.snapshot(), separators=(",", ":")) + "\n"
+        with open(tmp, "w") as f:
+            f.write(line)
+        os.replace(tmp, self.path)
+        self.lines = 1
+        self.bytes = len(line)
@@ -0,0 +1,225 @@
+import atexit
+import itertools
+import multiprocessing
+import os
+import threading
+
+from WordleIndex import FILTER_TYPES, WordIndex, parse_pattern, plugin_steps
+
+SHARD_MIN_WORDS = 200000   # smaller partitions are always filtered in-process
+# Workers are forked: a spawned worker would re-run the app script that
+# imported this module. Forking while other threads run can deadlock the
+# child, so the pool is forked once, by the first ShardedIndex, and every
+# later partition or edit is loaded into the same processes over their
+# pipes. Without fork every query simply stays in-process.
+CAN_SHARD = "fork" in multiprocessing.get_all_start_methods()
+
+
+# --- Worker processes ---
+def _serve(conn):
+    # Holds shards for any number of indexes and answers requests until it
+    # gets None. ("load", key, store, letters, length) indexes one shard's
+    # slice of a packed store, replacing the shard under `key`;
+    # ("drop", key) forgets it without a reply; (key, method, args) queries
+    # it. Every reply is (ok, result or exception).
+    shards = {}
+    while True:
+        request = conn.recv()
+        if request is None:
+            break
+        if request[0] == "drop":
+            shards.pop(request[1], None)
+            continue
+        try:
+            if request[0] == "load":
+                _, key, store, letters, length = request
+                shards.pop(key, None)
+                shards[key] = _index(store, letters, length)
+                result = len(shards[key])
+            else:
+                key, name, args = request
+                result = getattr(shards[key], name)(*args)
+            conn.send((True, result))
+        except Exception as e:
+            conn.send((False, e))
+    conn.close()
+
+def _index(store, letters, length):
+    decode = {i: c for i, c in enumerate(letters)}
+    text = store.decode("latin-1").translate(decode)
+    index = WordIndex((text[i:i + length] for i in range(0, len(text), length)), length)
+    index.drop_optional()
+    return index
+
+
+class _Pool:
+    # The worker processes every ShardedIndex shares. Loads are sent without
+    # waiting, so a shard is indexed while the app carries on; their replies
+    # are collected before the worker's next answer is read.
+    def __init__(self, size):
+        ctx = multiprocessing.get_context("fork")
+        self.conns = []
+        self.procs = []
+        for _ in range(size):
+            conn, child = ctx.Pipe()
+            proc = ctx.Process(target=_serve, args=(child,), daemon=True)
+            proc.start()
+            child.close()
+            self.conns.append(conn)
+            self.procs.append(proc)
+        self.unread = [0] * size   # load replies not collected yet, per worker
+        self.types = set(FILTER_TYPES)   # filter types the workers were forked with
+        self.lock = threading.Lock()     # one exchange at a time on the pipes
+
+    def __len__(self):
+        return len(self.conns)
+
+    def collect(self, w):
+        # Reads worker w's outstanding load replies; a failed load is raised
+        error = None
+        while self.unread[w]:
+            self.unread[w] -= 1
+            ok, result = self.conns[w].recv()
+            if not ok:
+                error = result
+        if error is not None:
+            raise error
+
+    def close(self):
+        for conn, proc in zip(self.conns, self.procs):
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            conn.close()
+            proc.join(1)
+        self.conns = []
+        self.procs = []
+
+_pool = None
+_keys = itertools.count()
+
+def _get_pool(size):
+    global _pool
+    if _pool is None:
+        _pool = _Pool(size)
+        atexit.register(_pool.close)
+    return _pool
+
+
+# --- Sharded index ---
+class ShardedIndex:
+    # A WordIndex whose per-word work is spread over persistent worker
+    # processes. Each worker indexes one contiguous id range of the packed
+    # store and keeps it for every later query, and partial masks come back
+    # in shard order, so merging is a shift and an OR. Queries that are pure
+    # bitset algebra stay in-process, where they cost less than a round trip.
+    # Anything not overridden here is the wrapped index's.
+    def __init__(self, index, shards=None):
+        self.index = index
+        self.shards = max(1, shards or os.cpu_count() or 1)
+        self.key = next(_keys)
+        self.ranges = []   # (worker, first id, end id) per loaded shard
+        self.stale = True
+        self.pool = None
+        # The pool is forked with the first ShardedIndex even when this
+        # partition is too small to shard: the app builds it before Tk or
+        # any thread exists, and no later partition needs another fork
+        if CAN_SHARD and self.shards > 1:
+            self.pool = _get_pool(self.shards)
+        if self.sharded():
+            self._load()
+
+    def __getattr__(self, name):
+        return getattr(self.index, name)
+
+    def __len__(self):
+        return len(self.index)
+
+    def sharded(self):
+        return self.pool is not None and len(self.index) >= SHARD_MIN_WORDS
+
+    def _load(self):
+        # Hands each worker its slice of the store; called again after an
+        # edit, which re-indexes the shards in place
+        index, pool = self.index, self.pool
+        length = index.length
+        step = -(-index.size // min(self.shards, len(pool)))
+        with pool.lock:
+            self.ranges = []
+            for w, start in enumerate(range(0, index.size, step)):
+                stop = min(start + step, index.size)
+                pool.conns[w].send(("load", self.key, index.store[start * length:stop * length],
+                                    index.letters, length))
+                pool.unread[w] += 1
+                self.ranges.append((w, start, stop))
+        self.stale = False
+
+    def close(self):
+        # Lets the workers forget this index's shards
+        if self.pool is None or not self.ranges:
+            return
+        with self.pool.lock:
+            for w, _, _ in self.ranges:
+                try:
+                    self.pool.conns[w].send(("drop", self.key))
+                except OSError:
+                    pass
+        self.ranges = []
+        self.stale = True
+
+    def _query(self, name, args_for):
+        # Sends every shard its request before collecting any reply, so the
+        # shards run side by side; `args_for(start, stop)` builds each one's
+        # arguments in shard-local ids
+        if self.stale:
+            self._load()
+        pool = self.pool
+        with pool.lock:
+            for w, start, stop in self.ranges:
+                pool.conns[w].send((self.key, name, args_for(start, stop)))
+            mask = 0
+            error = None
+            for w, start, _ in self.ranges:
+                try:
+                    pool.collect(w)
+                except Exception as e:
+                    error = e
+                ok, part = pool.conns[w].recv()
+                if ok:
+                    mask |= part << start
+                else:
+                    error = part
+        if error is not None:
+            raise error
+        return mask
+
+    def known(self, filters):
+        # Workers only have the filter types registered before the fork
+        return all(key in self.pool.types for key, values in filters.items() if values and key in FILTER_TYPES)
+
+    def match(self, filters):
+        # Only registered filters without a bitset leave per-word tests
+        # behind; everything else is a handful of ANDs on the full index
+        if not self.sharded() or not plugin_steps(self.index, filters)[1] or not self.known(filters):
+            return self.index.match(filters)
+        return self._query("match", lambda start, stop: (filters,))
+
+    def match_pattern(self, pattern, mask=None):
+        # Fixed-width patterns are all positional bitsets; a variable-width
+        # middle means a regex per word, which is what the shards are for
+        if not self.sharded() or not any(a.quant for a in parse_pattern(pattern)):
+            return self.index.match_pattern(pattern, mask)
+        if mask is None:
+            return self._query("match_pattern", lambda start, stop: (pattern,))
+        return self._query("match_pattern",
+                           lambda start, stop: (pattern, mask >> start & ((1 << stop - start) - 1)))
+
+    # Edits go to the full index; the shards are reloaded on their next query
+    def insert(self, word):
+        self.stale = True
+        return self.index.insert(word)
+
+    def remove(self, word):
+        self.stale = True
+        return self.index.remove(word)
@@ -0,0 +1,158 @@
+import argparse
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from WordleIndex import ALPHABETS, feedback, feedback_filters, iter_ids, solved_pattern
+from WordleSolver import TREE_FILE, rank_guesses, setup
+
+MAX_TURNS = 20
+
+
+# --- Strategies ---
+# A strategy takes (candidate mask, [(guess, pattern), ...]) and returns the
+# next guess. Strategies live for a whole worker, so anything they cache on
+# the candidate mask is shared by every game that reaches the same board.
+def first_strategy(index):
+    def pick(mask, history):
+        return index.word(next(iter_ids(mask)))
+    return pick
+
+def score_strategy(index):
+    cache = {}
+    def pick(mask, history):
+        if mask not in cache:
+            cache[mask] = index.word(rank_guesses(index, mask, iter_ids(mask))[0])
+        return cache[mask]
+    return pick
+
+def tree_strategy(index, path=TREE_FILE):
+    with gzip.open(path, "rt") as f:
+        tree = json.load(f)["tree"]
+    fallback = score_strategy(index)
+    def pick(mask, history):
+        node = tree
+        for _, pattern in history:
+            if isinstance(node, str) or str(pattern) not in node[1]:
+                return fallback(mask, history)
+            node = node[1][str(pattern)]
+        return node if isinstance(node, str) else node[0]
+    return pick
+
+STRATEGIES = {
+    "first": first_strategy,
+    "score": score_strategy,
+    "tree": tree_strategy,
+}
+
+
+# --- Games ---
+def play(index, answer_id, strategy, answers, hard=None):
+    # Plays one game the way the app would: each feedback is folded into a
+    # filters dict and the candidates are whatever index.match() leaves.
+    # In hard mode, `hard` is the strategy used whenever the main one picks
+    # a word outside the hint-satisfying pool.
+    # Returns the number of guesses, or None if the game was not solved.
+    filters = {"Not Contains": set(), "At Position": {}, "Not Position": {}}
+    answer = index.word(answer_id)
+    solved = solved_pattern(index.length)
+    history = []
+    played = 0
+    pool = index.all
+    mask = answers
+    for turn in range(1, MAX_TURNS + 1):
+        guess = strategy(mask, history)
+        if hard and not index.match_pattern(guess) & pool:
+            guess = hard(mask, history)
+        pattern = feedback(guess, answer)
+        if pattern == solved:
+            return turn
+        history.append((guess, pattern))
+        feedback_filters(guess, pattern, filters)
+        # Filters can't always rule the guess itself out, so drop played words
+        played |= index.match_pattern(guess)
+        pool = index.match(filters) & ~played
+        mask = pool & answers
+    return None
+
+
+# --- Worker processes ---
+_index = None
+_answers = 0
+_strategy = None
+_hard = None
+
+def _init_worker(words_path, answers_path, length, strategy, tree_path, hard, alphabet=None):
+    global _index, _answers, _strategy, _hard
+    _index, _answers, _ = setup(words_path, answers_path, length, alphabet=alphabet)
+    _strategy = STRATEGIES[strategy](_index, tree_path) if strategy == "tree" else STRATEGIES[strategy](_index)
+    _hard = score_strategy(_index) if hard else None
+
+def _play_chunk(ids):
+    out = []
+    for i in ids:
+        start = time.perf_counter()
+        turns = play(_index, i, _strategy, _answers, _hard)
+        out.append((i, turns, time.perf_counter() - start))
+    return out
+
+
+def simulate(words_path, answers_path=None, length=5, strategy="score", tree_path=TREE_FILE,
+             hard=False, processes=None, chunk=50, alphabet=None):
+    # Returns [(answer id, guesses or None, seconds), ...] and the index
+    options = (words_path, answers_path, length, strategy, tree_path, hard, alphabet)
+    index, answers, _ = setup(words_path, answers_path, length, alphabet=alphabet)
+    ids = list(iter_ids(answers))
+    chunks = [ids[i:i + chunk] for i in range(0, len(ids), chunk)]
+    if processes == 1:
+        _init_worker(*options)
+        results = [r for c in chunks for r in _play_chunk(c)]
+    else:
+        with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=options) as ex:
+            results = [r for part in ex.map(_play_chunk, chunks) for r in part]
+    return results, index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play every answer against a strategy and report statistics.")
+    parser.add_argument("--words", default="words.txt")
+    parser.add_argument("--answers", help="answer list (defaults to every word of the chosen length)")
+    parser.add_argument("--length", type=int, default=5)
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="score")
+    parser.add_argument("--tree", default=TREE_FILE, help="tree file for the tree strategy")
+    parser.add_argument("--hard", action="store_true", help="hard mode: guesses must fit all hints")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--timings", help="write per-game results to this CSV file")
+    parser.add_argument("--alphabet", choices=sorted(ALPHABETS), help="normalize words to this alphabet")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results, index = simulate(args.words, args.answers, args.length, args.strategy, args.tree, args.hard,
+                              args.processes, alphabet=args.alphabet)
+    elapsed = time.perf_counter() - start
+
+    dist = {}
+    for _, turns, _ in results:
+        dist[turns] = dist.get(turns, 0) + 1
+    solved = [turns for _, turns, _ in results if turns is not None]
+    times = [t for _, _, t in results]
+    print(f"{len(results)} games, strategy {args.strategy}{' (hard mode)' if args.hard else ''}, {elapsed:.2f}s "
+          f"({1000 * sum(times) / max(len(times), 1):.2f} ms/game mean, {1000 * max(times, default=0):.2f} ms max)")
+    for turns in sorted(t for t in dist if t is not None):
+        print(f"  {turns:2d}: {dist[turns]}")
+    if None in dist:
+        print(f"  unsolved: {dist[None]}")
+    if solved:
+        print(f"mean {sum(solved) / len(solved):.4f} guesses, {sum(1 for t in solved if t > 6)} over 6")
+
+    if args.timings:
+        with open(args.timings, "w", encoding="utf-8") as f:
+            f.write("answer,guesses,ms\n")
+            for i, turns, t in results:
+                f.write(f"{index.word(i)},{'' if turns is None else turns},{1000 * t:.3f}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import argparse
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from WordleIndex import ALPHABETS, WordIndex, bitset, iter_ids, solved_pattern, sorted_words
+
+TREE_FILE = "tree.json.gz"
+INF = float("inf")
+
+
+# --- Guess scoring ---
+def partition_score(index, guess, mask):
+    # Sum of squared class sizes: |mask| times the expected number of
+    # candidates left after this guess. Lower is better.
+    return sum(m.bit_count() ** 2 for m in index.split(guess, mask).values())
+
+def multi_score(index, guess, masks):
+    # partition_score summed over several boards in one split: the guess
+    # partitions the union of every board's candidates once, and each class
+    # is then counted against each board's mask
+    union = 0
+    for m in masks:
+        union |= m
+    return sum((c & m).bit_count() ** 2 for c in index.split(guess, union).values() for m in masks)
+
+def rank_guesses(index, mask, pool):
+    # Ties go to guesses that could themselves be the answer
+    return sorted(pool, key=lambda g: (partition_score(index, index.word(g), mask), not mask >> g & 1, g))
+
+
+# --- Exhaustive search ---
+class Solver:
+    # Minimizes the total number of guesses over every answer in a mask.
+    # `breadth` caps how many of the best-scoring guesses are tried at each
+    # node (0 tries the whole pool, which is exact but slow). Results are
+    # memoized on the candidate mask and branches are cut as soon as their
+    # lower bound reaches the best cost found so far.
+    def __init__(self, index, guess_pool, breadth=8):
+        self.index = index
+        self.words = index.words
+        self.pool = guess_pool
+        self.breadth = breadth
+        self.solved = solved_pattern(index.length)
+        self.memo = {}
+
+    def candidates(self, mask):
+        # Every remaining answer plus the guesses that score well overall
+        pool = set(iter_ids(mask))
+        pool.update(self.pool)
+        ranked = rank_guesses(self.index, mask, pool)
+        return ranked[:self.breadth] if self.breadth else ranked
+
+    def solve(self, mask, bound=INF):
+        n = mask.bit_count()
+        if not n:
+            return 0, None
+        if n <= 2:
+            return 2 * n - 1, next(iter_ids(mask))
+        hit = self.memo.get(mask)
+        if hit:
+            return hit
+        best = (INF, None)
+        for g in self.candidates(mask):
+            cost = self.cost(g, mask, min(bound, best[0]))
+            if cost < best[0]:
+                best = (cost, g)
+        if best[0] < bound:
+            self.memo[mask] = best
+        return best
+
+    def cost(self, guess, mask, limit=INF):
+        classes = self.index.split(self.words[guess], mask)
+        if len(classes) == 1 and self.solved not in classes:
+            return INF
+        sizes = {p: m.bit_count() for p, m in classes.items() if p != self.solved}
+        n = mask.bit_count()
+        # Each remaining class needs at least one more guess per answer, and
+        # all but one of its answers need two
+        lower = n + sum(2 * s - 1 for s in sizes.values())
+        if lower >= limit:
+            return INF
+        total = n
+        for p in sorted(sizes, key=sizes.get, reverse=True):
+            lower -= 2 * sizes[p] - 1
+            child, _ = self.solve(classes[p], limit - total - lower)
+            total += child
+            if total + lower >= limit:
+                return INF
+        return total
+
+    def tree(self, mask, guess=None):
+        # Nested [guess, {pattern: subtree}] lists; a bare word is a leaf
+        if mask.bit_count() == 1 and guess is None:
+            return self.words[next(iter_ids(mask))]
+        if guess is None:
+            _, guess = self.solve(mask)
+        children = {}
+        for p, m in self.index.split(self.words[guess], mask).items():
+            if p != self.solved:
+                children[str(p)] = self.tree(m)
+        return [self.words[guess], children]
+
+
+# --- Worker processes ---
+_solver = None
+_answers = 0
+
+def _init_worker(words_path, answers_path, length, all_guesses, breadth, hard, alphabet=None):
+    global _solver, _answers
+    index, _answers, pool = setup(words_path, answers_path, length, all_guesses, alphabet)
+    # In hard mode every later guess has to fit the hints, so only the
+    # remaining candidates themselves are tried
+    _solver = Solver(index, [] if hard else _top_guesses(index, _answers, pool, breadth), breadth)
+
+def _evaluate(guess):
+    return _solver.cost(guess, _answers), guess
+
+def _subtree(guess):
+    return _solver.tree(_answers, guess)
+
+def setup(words_path, answers_path, length, all_guesses=False, alphabet=None):
+    # Index for one length, the answer mask and the ids allowed as guesses.
+    # `alphabet` names an entry of ALPHABETS used to normalize both lists.
+    alphabet = ALPHABETS[alphabet] if alphabet else None
+    index = WordIndex(sorted_words(words_path, length, length, alphabet=alphabet), length)
+    if answers_path:
+        code = {w: i for i, w in enumerate(index.words)}
+        normalize = alphabet.normalize if alphabet else lambda line: line.strip().lower()
+        with open(answers_path, "r", encoding="utf-8") as f:
+            answers = bitset({code[w] for w in map(normalize, f) if w in code}, len(index))
+    else:
+        answers = index.all
+    pool = range(len(index)) if all_guesses else list(iter_ids(answers))
+    return index, answers, pool
+
+def _top_guesses(index, answers, pool, count):
+    return rank_guesses(index, answers, pool)[:count]
+
+
+# --- Tree file ---
+def save_tree(path, index, answers, tree, hard=False):
+    data = {
+        "length": index.length,
+        "hard": hard,
+        "answers": None if answers == index.all else index.words_for(answers),
+        "tree": tree,
+    }
+    with gzip.open(path, "wt") as f:
+        json.dump(data, f, separators=(",", ":"))
+
+def load_tree(path, index):
+    # Replays the tree against the index once, so that "best next guess" is
+    # a dict lookup keyed on the candidate mask (restricted to the answers).
+    try:
+        with gzip.open(path, "rt") as f:
+            data = json.load(f)
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+    if data.get("length") != index.length or not hasattr(index, "split"):
+        return None
+    if data["answers"] is None:
+        answers = index.all
+    else:
+        code = {w: i for i, w in enumerate(index.words)}
+        answers = bitset({code[w] for w in data["answers"] if w in code}, len(index))
+
+    lookup = {}
+    stack = [(data["tree"], answers)]
+    while stack:
+        node, mask = stack.pop()
+        if isinstance(node, str):
+            lookup[mask] = node
+            continue
+        guess, children = node
+        lookup[mask] = guess
+        classes = index.split(guess, mask)
+        for p, child in children.items():
+            if int(p) in classes:
+                stack.append((child, classes[int(p)]))
+    return answers, lookup
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the guess tree with the fewest average guesses.")
+    parser.add_argument("--words", default="words.txt")
+    parser.add_argument("--answers", help="answer list (defaults to every word of the chosen length)")
+    parser.add_argument("--length", type=int, default=5)
+    parser.add_argument("--out", default=TREE_FILE)
+    parser.add_argument("--all-guesses", action="store_true",
+                        help="allow any dictionary word as a guess, not only answers")
+    parser.add_argument("--breadth", type=int, default=8, help="guesses tried per node (0 = all)")
+    parser.add_argument("--root-breadth", type=int, default=32, help="first guesses evaluated in parallel")
+    parser.add_argument("--hard", action="store_true", help="hard mode: later guesses must fit all hints")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--alphabet", choices=sorted(ALPHABETS), help="normalize words to this alphabet")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    options = (args.words, args.answers, args.length, args.all_guesses, args.breadth, args.hard, args.alphabet)
+    index, answers, pool = setup(*options[:4], args.alphabet)
+    if not answers:
+        parser.error(f"no answers of length {args.length} are in {args.words}")
+    first = _top_guesses(index, answers, pool, args.root_breadth)
+    with ProcessPoolExecutor(args.processes, initializer=_init_worker, initargs=options) as ex:
+        cost, guess = min(ex.map(_evaluate, first))
+        tree = ex.submit(_subtree, guess).result()
+    save_tree(args.out, index, answers, tree, args.hard)
+
+    n = answers.bit_count()
+    print(f"{n} answers, first guess {index.word(guess)!r}, "
+          f"average {cost / n:.4f} guesses, {time.perf_counter() - start:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
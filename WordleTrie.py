@@ -0,0 +1,312 @@
+import re
+from array import array
+from collections import Counter
+
+from WordleIndex import bitset, contradicts, iter_ids, parse_pattern, plugin_steps, scan
+
+
+# --- DAWG construction ---
+class _Node:
+    __slots__ = ("final", "edges", "id")
+
+    def __init__(self):
+        self.final = False
+        self.edges = {}
+        self.id = -1
+
+def _build(words):
+    # Incremental construction of a minimal acyclic automaton from sorted,
+    # unique input (Daciuk et al.): suffixes shared by several words are
+    # merged as soon as no later word can extend them.
+    register = {}
+    unchecked = []
+    root = _Node()
+
+    def minimize(down_to):
+        while len(unchecked) > down_to:
+            parent, letter, child = unchecked.pop()
+            key = (child.final, tuple((c, n.id) for c, n in child.edges.items()))
+            if key in register:
+                parent.edges[letter] = register[key]
+            else:
+                child.id = len(register)
+                register[key] = child
+
+    prev = ""
+    size = 0
+    for word in words:
+        size += 1
+        common = 0
+        for a, b in zip(word, prev):
+            if a != b:
+                break
+            common += 1
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else root
+        for letter in word[common:]:
+            child = _Node()
+            node.edges[letter] = child
+            unchecked.append((node, letter, child))
+            node = child
+        node.final = True
+        prev = word
+    minimize(0)
+    return root, size, len(prev)
+
+
+# --- Packed trie over one length partition ---
+class WordTrie:
+    # Same interface as WordIndex, but the dictionary is kept as a packed
+    # DAWG instead of a list of str. Word ids are lexicographic ranks, so
+    # masks from either representation are interchangeable.
+    def __init__(self, words=(), length=None):
+        # Like WordIndex, `words` may be any sorted iterable of unique words
+        root, self.size, last = _build(words)
+        self.length = length if length is not None else last
+        self.all = (1 << self.size) - 1
+        self._pack(root)
+        self._full_counts = None
+
+    def _pack(self, root):
+        order = {id(root): 0}
+        nodes = [root]
+        for node in nodes:
+            for child in node.edges.values():
+                if id(child) not in order:
+                    order[id(child)] = len(nodes)
+                    nodes.append(child)
+
+        self.first = array("I", [0])
+        self.targets = array("I")
+        self.final = bytearray(len(nodes))
+        labels = []
+        for i, node in enumerate(nodes):
+            self.final[i] = node.final
+            for letter, child in node.edges.items():
+                labels.append(letter)
+                self.targets.append(order[id(child)])
+            self.first.append(len(self.targets))
+        self.labels = "".join(labels)
+        self.letters = "".join(sorted(set(labels)))
+
+        # Words reachable below each node, for id <-> word ranking
+        self.count = array("I", bytes(4 * len(nodes)))
+        for i in reversed(range(len(nodes))):
+            total = self.final[i]
+            for e in range(self.first[i], self.first[i + 1]):
+                total += self.count[self.targets[e]]
+            self.count[i] = total
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def words(self):
+        return self.words_for(self.all)
+
+    def word(self, rank):
+        first, targets, labels, count, final = self.first, self.targets, self.labels, self.count, self.final
+        node, letters = 0, []
+        while True:
+            if final[node]:
+                if rank == 0:
+                    return "".join(letters)
+                rank -= 1
+            for e in range(first[node], first[node + 1]):
+                child = targets[e]
+                if rank < count[child]:
+                    letters.append(labels[e])
+                    node = child
+                    break
+                rank -= count[child]
+
+    def ids(self, mask):
+        return list(iter_ids(mask))
+
+    def words_for(self, mask):
+        return [self.word(i) for i in iter_ids(mask)]
+
+    def letter_counts(self, mask):
+        # Same result as WordIndex.letter_counts, counted on the edges
+        # instead of by spelling out words: an edge at depth d adds every
+        # candidate below it to its letter at position d. The full set is
+        # counted once; a set holding most words is counted as the full
+        # set minus the rest.
+        if self._full_counts is None:
+            self._full_counts = self._count_all()
+        mask &= self.all
+        if mask == self.all:
+            return [dict(counts) for counts in self._full_counts]
+        if 2 * mask.bit_count() <= self.size:
+            return self._count_masked(mask)
+        rest = self._count_masked(self.all ^ mask)
+        return [{c: n - out.get(c, 0) for c, n in full.items() if n > out.get(c, 0)}
+                for full, out in zip(self._full_counts, rest)]
+
+    def _count_all(self):
+        # Every word has `length` letters, so each node sits at one depth
+        # and nodes come out of _pack in breadth-first order: a node's
+        # parents are all done before it, and the number of paths reaching
+        # it times the words below an edge is that edge's share
+        first, targets, labels, count = self.first, self.targets, self.labels, self.count
+        counts = [{} for _ in range(self.length)]
+        paths = [0] * len(self.final)
+        depth = [0] * len(self.final)
+        paths[0] = 1
+        for node in range(len(self.final)):
+            p, d = paths[node], depth[node]
+            if not p or d >= self.length:
+                continue
+            pos = counts[d]
+            for e in range(first[node], first[node + 1]):
+                child = targets[e]
+                pos[labels[e]] = pos.get(labels[e], 0) + p * count[child]
+                paths[child] += p
+                depth[child] = d + 1
+        return counts
+
+    def _count_masked(self, mask):
+        # Depth-first, entering only edges with candidates below them; the
+        # ids below an edge are one contiguous range, counted straight off
+        # the mask's bytes
+        first, targets, labels, count = self.first, self.targets, self.labels, self.count
+        length = self.length
+        raw = mask.to_bytes((self.size + 7) // 8, "little")
+        counts = [{} for _ in range(length)]
+        stack = [(0, 0, 0)]
+        while stack:
+            node, d, offset = stack.pop()
+            pos = counts[d]
+            for e in range(first[node], first[node + 1]):
+                child = targets[e]
+                n = count[child]
+                k = (int.from_bytes(raw[offset >> 3:(offset + n + 7) >> 3], "little")
+                     >> (offset & 7) & ((1 << n) - 1)).bit_count()
+                if k:
+                    pos[labels[e]] = pos.get(labels[e], 0) + k
+                    if d + 1 < length:
+                        stack.append((child, d + 1, offset))
+                offset += n
+        return counts
+
+    def anagrams(self, letters):
+        if len(letters) != self.length:
+            return 0
+        return self.sub_anagrams(letters)
+
+    def sub_anagrams(self, letters):
+        # Depth-first with a running count of the letters still on offer;
+        # every word has `length` letters, so with exactly `length` offered
+        # this is the exact-anagram query too
+        first, targets, labels, count, final = self.first, self.targets, self.labels, self.count, self.final
+        length = self.length
+        offered = Counter(letters)
+        ids = []
+
+        def visit(node, depth, offset):
+            if depth == length:
+                if final[node]:
+                    ids.append(offset)
+                return
+            if final[node]:
+                offset += 1
+            for e in range(first[node], first[node + 1]):
+                child = targets[e]
+                c = labels[e]
+                if offered[c]:
+                    offered[c] -= 1
+                    visit(child, depth + 1, offset)
+                    offered[c] += 1
+                offset += count[child]
+
+        visit(0, 0, 0)
+        return bitset(ids, self.size)
+
+    def _walk(self, allowed, required=frozenset()):
+        # Depth-first over the DAWG, skipping whole subtrees whose edge is
+        # ruled out at that depth or that can no longer fit the required
+        # letters. Yields the id of every surviving word.
+        first, targets, labels, count, final = self.first, self.targets, self.labels, self.count, self.final
+        length = self.length
+        stack = [(0, 0, 0, required)]
+        while stack:
+            node, depth, offset, missing = stack.pop()
+            if depth == length:
+                if final[node] and not missing:
+                    yield offset
+                continue
+            if len(missing) > length - depth:
+                continue
+            ok = allowed[depth]
+            if final[node]:
+                offset += 1
+            children = []
+            for e in range(first[node], first[node + 1]):
+                child = targets[e]
+                letter = labels[e]
+                if ok(letter):
+                    children.append((child, depth + 1, offset, missing - {letter} if letter in missing else missing))
+                offset += count[child]
+            stack.extend(reversed(children))
+
+    def _mask(self, allowed, required=frozenset()):
+        return bitset(self._walk(allowed, required), self.size)
+
+    def match(self, filters):
+        if contradicts(filters, self.length):
+            return 0
+        grey = filters["Not Contains"]
+        green = filters["At Position"]
+        yellow = filters["Not Position"]
+        allowed = []
+        for pos in range(self.length):
+            banned = set(grey)
+            if pos in yellow:
+                banned.add(yellow[pos])
+            if pos in green:
+                letter = green[pos]
+                allowed.append(lambda c, letter=letter, banned=banned: c == letter and c not in banned)
+            else:
+                allowed.append(lambda c, banned=banned: c not in banned)
+        mask = self._mask(allowed, frozenset(yellow.values()))
+        masks, tests = plugin_steps(self, filters)
+        for m in masks:
+            mask &= m
+        return scan(self, mask, tests)
+
+    def match_pattern(self, pattern, mask=None):
+        atoms = parse_pattern(pattern)
+        variable = [i for i, a in enumerate(atoms) if a.quant]
+        head, tail = (atoms, ()) if not variable else (atoms[:variable[0]], atoms[variable[-1] + 1:])
+        if (not variable and len(atoms) != self.length) or len(head) + len(tail) > self.length:
+            return 0
+
+        allowed = [lambda c: True] * self.length
+        for pos, atom in list(enumerate(head)) + list(enumerate(tail, self.length - len(tail))):
+            if atom.letters is not None:
+                allowed[pos] = (lambda c, a=atom: (c in a.letters) != a.negate)
+        result = self._mask(allowed)
+        if variable:
+            middle = re.compile("".join(a.regex() for a in atoms[variable[0]:variable[-1] + 1]))
+            start, end = len(head), self.length - len(tail)
+            ids = list(iter_ids(result if mask is None else result & mask))
+            keep = [i for i, w in zip(ids, self.words_for(bitset(ids, self.size)))
+                    if middle.fullmatch(w, start, end)]
+            return bitset(keep, self.size)
+        return result if mask is None else result & mask
+
+    def prefix(self, prefix):
+        node, offset = 0, 0
+        first, targets, labels, count, final = self.first, self.targets, self.labels, self.count, self.final
+        for letter in prefix:
+            if final[node]:
+                offset += 1
+            for e in range(first[node], first[node + 1]):
+                if labels[e] == letter:
+                    node = targets[e]
+                    break
+                offset += count[targets[e]]
+            else:
+                return 0
+        # Every word below the prefix node is a contiguous run of ids
+        return ((1 << count[node]) - 1) << offset
@@ -0,0 +1,43 @@
+import random
+import unittest
+
+from WordleIndex import WordIndex, feedback, feedback_filters
+from WordleSession import empty_filters
+
+
+class FeedbackFiltersTest(unittest.TestCase):
+    def replay(self, index, answer, guesses):
+        filters = empty_filters()
+        played = []
+        for guess in guesses:
+            pattern = feedback(guess, answer)
+            feedback_filters(guess, pattern, filters)
+            played.append((guess, pattern))
+        return filters, played
+
+    def test_displaced_yellow_is_still_required(self):
+        index = WordIndex(["acold", "schld", "scald", "sycld"], 5)
+        filters, _ = self.replay(index, "scald", ["arise", "could"])
+        self.assertEqual(index.words_for(index.match(filters)), ["scald"])
+
+    def test_match_keeps_every_consistent_word(self):
+        # A small alphabet puts yellows in the same column often. The
+        # filters can't say everything feedback does, so match() may keep
+        # extra words, but never drop a consistent one or keep one missing
+        # a letter the feedback showed
+        rng = random.Random(33)
+        words = sorted({"".join(rng.choice("abcdef") for _ in range(5)) for _ in range(3000)})
+        index = WordIndex(words, 5)
+        for _ in range(200):
+            answer = rng.choice(words)
+            filters, played = self.replay(index, answer, rng.sample(words, rng.randint(1, 4)))
+            found = set(index.words_for(index.match(filters)))
+            consistent = {w for w in words if all(feedback(g, w) == p for g, p in played)}
+            self.assertLessEqual(consistent, found)
+            shown = {g[pos] for g, p in played for pos in range(5) if p // 3 ** pos % 3}
+            for w in found:
+                self.assertLessEqual(shown, set(w))
+
+
+if __name__ == "__main__":
+    unittest.main()